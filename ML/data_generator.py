@@ -1,80 +1,227 @@
-import pandas as pd
+"""
+Synthetic training data for the secret classifier.
+
+    python data_generator.py                      # ML/dataset.csv, 5000 rows
+    python data_generator.py --out shards/ --samples 20000000 --workers 8 --features
+
+With --out the rows are written by worker processes as a sharded dataset:
+every shard is seeded from (seed, shard index), so the output does not depend
+on the number of workers, and each shard is written in --batch-size parts so
+memory stays bounded. A manifest.json lists the parts; ML/model.py accepts
+the directory as --data.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import multiprocessing
+import os
 import random
 import string
-import secrets
-import hashlib
-import uuid
 import sys
-import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 OPENAI_PREFIX = "sk-"
 GITHUB_PREFIX = "ghp_"
 AWS_PREFIX = "AKIA"
 ALNUM = string.ascii_letters + string.digits
 
-def gen_active_like_secret():
+MANIFEST = "manifest.json"
+SHARD_FORMATS = ("npz", "parquet")
+DEFAULT_BATCH_SIZE = 1_000_000
+
+# Default rows per shard; the shard count must not follow --workers, or the
+# seeds (and so the rows) would change with the worker count
+SHARD_ROWS = 250_000
+
+# Feature column names when features are precomputed (order of extract_features_batch)
+FEATURE_COLUMNS = ['entropy', 'length', 'digit_ratio', 'upper_ratio', 'symbol_ratio', 'prefix_score', 'length_score']
+
+
+def gen_active_like_secret(rng=random):
     """Label = 1: High risk, looks real and could be active"""
-    kind = random.choice(["openai", "github", "aws"])
+    kind = rng.choice(["openai", "github", "aws"])
 
     if kind == "openai":
-        return OPENAI_PREFIX + ''.join(random.choices(ALNUM, k=48)), 1
+        return OPENAI_PREFIX + ''.join(rng.choices(ALNUM, k=48)), 1
     if kind == "github":
-        return GITHUB_PREFIX + ''.join(random.choices(ALNUM, k=36)), 1
+        return GITHUB_PREFIX + ''.join(rng.choices(ALNUM, k=36)), 1
     if kind == "aws":
-        return AWS_PREFIX + ''.join(random.choices(string.ascii_uppercase + string.digits, k=16)), 1
+        return AWS_PREFIX + ''.join(rng.choices(string.ascii_uppercase + string.digits, k=16)), 1
 
-def gen_revoked_or_fake_but_valid_format():
+def gen_revoked_or_fake_but_valid_format(rng=random):
     """Label = 0: Correct format, but revoked or fake (Hard Negative)"""
-    kind = random.choice(["openai", "github", "aws"])
+    kind = rng.choice(["openai", "github", "aws"])
 
     if kind == "openai":
-        return OPENAI_PREFIX + ''.join(random.choices(ALNUM, k=48)), 0
+        return OPENAI_PREFIX + ''.join(rng.choices(ALNUM, k=48)), 0
     if kind == "github":
-        return GITHUB_PREFIX + ''.join(random.choices(ALNUM, k=36)), 0
+        return GITHUB_PREFIX + ''.join(rng.choices(ALNUM, k=36)), 0
     if kind == "aws":
-        return AWS_PREFIX + ''.join(random.choices(string.ascii_uppercase + string.digits, k=16)), 0
+        return AWS_PREFIX + ''.join(rng.choices(string.ascii_uppercase + string.digits, k=16)), 0
 
-def gen_low_risk_noise():
+def gen_low_risk_noise(rng=random):
     """Label = 0: Obvious noise or common placeholders"""
-    text = random.choice([
+    # Drawn from `rng` (not secrets/uuid4) so seeded runs are reproducible
+    text = rng.choice([
         "your_api_key_here",
         "example_token",
         "sk-example-123456",
         "TODO: replace this",
-        secrets.token_urlsafe(random.randint(10, 50)), # Random Base64 string
-        hashlib.sha256(secrets.token_bytes(32)).hexdigest(), # Hash
-        str(uuid.uuid4()) # UUID
+        base64.urlsafe_b64encode(rng.randbytes(rng.randint(10, 50))).rstrip(b'=').decode(), # Random Base64 string
+        hashlib.sha256(rng.randbytes(32)).hexdigest(), # Hash
+        str(uuid.UUID(int=rng.getrandbits(128), version=4)) # UUID
     ])
     return text, 0
 
-def generate_dataset(n_samples=5000):
-    data = []
-    
+def generate_row(rng=random):
+    roll = rng.random()
+
+    if roll < 0.35:
+        # 35% Active/Real-looking secrets
+        return gen_active_like_secret(rng)
+    if roll < 0.70:
+        # 35% Format-compliant but fake/revoked (Hard Negatives)
+        return gen_revoked_or_fake_but_valid_format(rng)
+    # 30% Noise
+    return gen_low_risk_noise(rng)
+
+def generate_dataset(n_samples=5000, output_path=None, seed=None):
     print(f"Generating dataset with {n_samples} samples...")
-    
-    for _ in range(n_samples):
-        roll = random.random()
-
-        if roll < 0.35:
-            # 35% Active/Real-looking secrets
-            text, label = gen_active_like_secret()
-        elif roll < 0.70:
-            # 35% Format-compliant but fake/revoked (Hard Negatives)
-            text, label = gen_revoked_or_fake_but_valid_format()
-        else:
-            # 30% Noise
-            text, label = gen_low_risk_noise()
-            
-        data.append({"text": text, "label": label})
-
-    df = pd.DataFrame(data)
-    
+
+    rng = random.Random(seed) if seed is not None else random
+    data = [generate_row(rng) for _ in range(n_samples)]
+    df = pd.DataFrame(data, columns=["text", "label"])
+
     # Save the file
-    output_path = os.path.join(os.path.dirname(__file__), 'dataset.csv')
+    output_path = output_path or os.path.join(os.path.dirname(__file__), 'dataset.csv')
     df.to_csv(output_path, index=False)
     print(f"Dataset created: {output_path}")
     print(df['label'].value_counts())
     return df
 
+
+# ---- Sharded datasets ----
+
+def write_part(path, texts, labels, features, fmt):
+    """
+    One part file. npz keeps the texts Arrow-style: UTF-8 bytes plus offsets.
+    Parquet needs pyarrow (or fastparquet) installed.
+    """
+    if fmt == "npz":
+        encoded = [text.encode('utf-8') for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        arrays = {"text_data": np.frombuffer(b''.join(encoded), dtype=np.uint8), "text_offsets": offsets, "label": labels}
+        if features is not None:
+            arrays["features"] = features
+        np.savez(path, **arrays)
+    else:
+        df = pd.DataFrame({"text": texts, "label": labels})
+        if features is not None:
+            for i, name in enumerate(FEATURE_COLUMNS):
+                df[name] = features[:, i]
+        df.to_parquet(path, index=False)
+
+
+def read_part(path):
+    """(texts, labels, features or None) of one part file."""
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            blob = data["text_data"].tobytes()
+            offsets = data["text_offsets"].tolist()
+            texts = [blob[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])]
+            features = data["features"] if "features" in data.files else None
+            return texts, data["label"], features
+
+    df = pd.read_parquet(path)
+    features = df[FEATURE_COLUMNS].to_numpy(dtype=np.float32) if FEATURE_COLUMNS[0] in df.columns else None
+    return df["text"].tolist(), df["label"].to_numpy(dtype=np.int8), features
+
+
+def generate_shard(out_dir, shard, rows, seed, batch_size, with_features, fmt):
+    """Writes one shard as parts of at most `batch_size` rows; returns [(file, rows), ...]."""
+    if with_features:
+        from main_function.utils import extract_features_batch
+
+    rng = random.Random(f"{seed}-{shard}")
+    parts = []
+    for part, start in enumerate(range(0, rows, batch_size)):
+        count = min(batch_size, rows - start)
+        texts, labels = zip(*(generate_row(rng) for _ in range(count)))
+        labels = np.array(labels, dtype=np.int8)
+        features = extract_features_batch(texts) if with_features else None
+
+        name = f"part-{shard:05d}-{part:04d}.{fmt}"
+        write_part(os.path.join(out_dir, name), texts, labels, features, fmt)
+        parts.append((name, count))
+    return parts
+
+
+def generate_sharded(out_dir, n_samples, shards=None, workers=1, seed=42, batch_size=DEFAULT_BATCH_SIZE,
+                     with_features=False, fmt="npz"):
+    """Generates `n_samples` rows into `out_dir` and returns the manifest."""
+    if fmt not in SHARD_FORMATS:
+        raise ValueError(f"Unknown shard format: {fmt}")
+    shards = shards or max(1, -(-n_samples // SHARD_ROWS))
+    os.makedirs(out_dir, exist_ok=True)
+    sizes = [n_samples // shards + (1 if i < n_samples % shards else 0) for i in range(shards)]
+    print(f"Generating {n_samples} samples in {shards} shards with {workers} workers...")
+
+    jobs = [(out_dir, shard, rows, seed, batch_size, with_features, fmt) for shard, rows in enumerate(sizes) if rows]
+    if workers <= 1:
+        results = [generate_shard(*job) for job in jobs]
+    else:
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            results = list(pool.map(generate_shard, *zip(*jobs)))
+
+    manifest = {
+        "rows": n_samples,
+        "seed": seed,
+        "format": fmt,
+        "features": FEATURE_COLUMNS if with_features else None,
+        "parts": [{"file": name, "rows": rows} for parts in results for name, rows in parts]
+    }
+    with open(os.path.join(out_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Dataset created: {out_dir} ({len(manifest['parts'])} parts)")
+    return manifest
+
+
+def iter_parts(out_dir):
+    """Yields (texts, labels, features or None) for every part listed in the manifest, in order."""
+    with open(os.path.join(out_dir, MANIFEST), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    for part in manifest["parts"]:
+        yield read_part(os.path.join(out_dir, part["file"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic training data")
+    parser.add_argument("--samples", type=int, default=5000, help="Rows to generate (default: 5000)")
+    parser.add_argument("--out", help="Write a sharded dataset to this directory instead of ML/dataset.csv")
+    parser.add_argument("--shards", type=int, help=f"Shard count (default: one per {SHARD_ROWS} rows)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) - 1),
+                        help="Generator processes (default: CPU count - 1)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the dataset / base seed of the shards (default: 42)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Rows per part file (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--features", action="store_true", help="Also store the precomputed feature columns")
+    parser.add_argument("--format", choices=SHARD_FORMATS, default="npz", help="Part file format (default: npz)")
+    args = parser.parse_args()
+
+    if args.out:
+        generate_sharded(args.out, args.samples, args.shards, args.workers, args.seed, args.batch_size,
+                         args.features, args.format)
+    else:
+        generate_dataset(args.samples, seed=args.seed)
+
 if __name__ == "__main__":
-    generate_dataset()
\ No newline at end of file
+    main()
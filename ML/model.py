@@ -1,117 +1,246 @@
-import xgboost as xgb
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import pandas as pd
-import numpy as np
-import sys
+"""
+Trains the secret classifier and exports it for the scanners.
+
+Runs headless by default; plots are only drawn with --plot (saved next to the
+model) or --show (also opened in a window):
+
+    python ML/model.py --workers 4 --nthread 8 --rounds 100
+    python ML/model.py --data big.csv --chunk-size 500000 --plot
+    python ML/model.py --data shards/        # sharded dataset from data_generator.py --out
+
+The dataset is streamed in chunks, features are extracted in worker
+processes, and the booster is trained with xgb.train and the hist tree method.
+Wall time is reported per phase (generation, featurization, training, eval).
+"""
+import argparse
+import multiprocessing
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
 
 # Add the parent directory to sys.path to import the utils module
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from main_function.utils import extract_features
-
-from data_generator import generate_dataset
-
-if __name__ == "__main__":
-
-    # Define the path for the dataset file
-    csv_path = os.path.join(os.path.dirname(__file__), 'dataset.csv')
-    
-    # Check if the dataset exists; if not, generate a new one with 6000 samples
-    if not os.path.exists(csv_path):
-        df = generate_dataset(6000)
+from main_function.utils import extract_features_batch
+from main_function.tree_model import compile_model, save_compiled
+
+from data_generator import generate_dataset, iter_parts
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATASET = os.path.join(ML_DIR, 'dataset.csv')
+DEFAULT_MODEL = os.path.join(ML_DIR, 'xgb_model.json')
+
+FEATURE_NAMES = ['Entropy', 'Length', 'Digit Ratio', 'Upper Ratio', 'Symbol Ratio', 'Prefix Score', 'Length Score']
+
+# Chunks being featurized at once, per worker
+MAX_IN_FLIGHT = 2
+
+
+def iter_chunks(data_path, chunk_size):
+    """
+    Yields (texts, labels, features or None) chunks: `chunk_size` rows at a time
+    from a CSV, or one part file at a time from a sharded dataset directory.
+    """
+    if os.path.isdir(data_path):
+        yield from iter_parts(data_path)
+        return
+    for chunk in pd.read_csv(data_path, chunksize=chunk_size, dtype={'text': str}, keep_default_na=False):
+        yield chunk['text'].astype(str).tolist(), chunk['label'].to_numpy(dtype=np.int8), None
+
+
+def featurize(texts):
+    return extract_features_batch(texts)
+
+
+def featurize_dataset(chunks, workers):
+    """
+    Feature matrix and labels for every chunk, in order. Only the float32
+    features are kept; texts are dropped once featurized, and chunks with
+    precomputed features are used as they are.
+    With workers > 1 the chunks are featurized in worker processes while the
+    next ones are read; at most workers * MAX_IN_FLIGHT chunks are pending.
+    """
+    features, labels = [], []
+    if workers <= 1:
+        for texts, y, x in chunks:
+            features.append(featurize(texts) if x is None else x)
+            labels.append(y)
     else:
-        # Load the existing dataset
-        df = pd.read_csv(csv_path)
-
-        # Ensure the text column is treated as strings to avoid errors
-        df['text'] = df['text'].astype(str)
-
-    # Extract features from the text column using the utility function
-    # Convert the list of features into a NumPy array for the model
-    X = np.array([extract_features(t) for t in df['text']])
-    y = df['label'].values
-
-    # Split the data into training (80%) and testing (20%) sets
-    # We use sample() for random splitting and keep the indices
-    train_indices = df.sample(frac=0.8, random_state=42).index
-    
-    X_train = X[train_indices]
-    y_train = y[train_indices]
-    
-    # Create the test set by removing the training indices from the dataset
-    X_test = np.delete(X, train_indices, axis=0)
-    y_test = np.delete(y, train_indices)
-
-    print(f"Train: {len(X_train)} | Test: {len(X_test)}")
-
-    # Initialize the XGBoost Classifier with specific hyperparameters
-    model = xgb.XGBClassifier(
-        n_estimators=100,          
-        max_depth=4,                
-        learning_rate=0.1,        
-        eval_metric=["logloss", "error"], 
-        use_label_encoder=False    
-    )
-
-    # Train the model and monitor performance on both training and test sets
-    eval_set = [(X_train, y_train), (X_test, y_test)]
-    model.fit(X_train, y_train, eval_set=eval_set, verbose=False)
-
-    # Evaluate the model on the test set
-    y_pred = model.predict(X_test)
-    y_prob = model.predict_proba(X_test)[:, 1] # Probability for the positive class
-    
-    # Calculate and print accuracy
-    acc = accuracy_score(y_test, y_pred)
-    print("\n" + "="*40)
-    print(f"Accuracy: {acc * 100:.2f}%")
-    print("="*40)
-    
-    # Print detailed classification report (Precision, Recall, F1-score)
-    print(classification_report(y_test, y_pred))
-
-    # Visualization Setup
+        pending = []
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            for texts, y, x in chunks:
+                # Futures and ready matrices share the queue so the order is kept
+                pending.append(pool.submit(featurize, texts) if x is None else x)
+                labels.append(y)
+                if len(pending) >= workers * MAX_IN_FLIGHT:
+                    features.append(_result(pending.pop(0)))
+            features.extend(_result(item) for item in pending)
+
+    if not features:
+        raise ValueError("The dataset is empty")
+    return np.concatenate(features), np.concatenate(labels)
+
+
+def _result(item):
+    return item if isinstance(item, np.ndarray) else item.result()
+
+
+def split(n, test_fraction, seed):
+    """Boolean test mask: every row lands in the test set with probability test_fraction."""
+    return np.random.default_rng(seed).random(n) < test_fraction
+
+
+def evaluate(y_true, prob, threshold=0.5):
+    """Accuracy, per-class precision / recall / F1 and the confusion matrix."""
+    y_pred = (prob >= threshold).astype(np.int8)
+    cm = np.zeros((2, 2), dtype=np.int64)
+    np.add.at(cm, (y_true, y_pred), 1)
+
+    per_class = {}
+    for label in (0, 1):
+        tp = cm[label, label]
+        predicted, actual = cm[:, label].sum(), cm[label, :].sum()
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / actual if actual else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_class[label] = (precision, recall, f1, int(actual))
+    return {"accuracy": float(np.trace(cm) / cm.sum()), "per_class": per_class, "confusion": cm, "y_pred": y_pred}
+
+
+def print_report(metrics):
+    print("\n" + "=" * 40)
+    print(f"Accuracy: {metrics['accuracy'] * 100:.2f}%")
+    print("=" * 40)
+    print(f"{'':>8}{'precision':>11}{'recall':>9}{'f1-score':>10}{'support':>9}")
+    for label, (precision, recall, f1, support) in metrics['per_class'].items():
+        print(f"{label:>8}{precision:>11.2f}{recall:>9.2f}{f1:>10.2f}{support:>9}")
+
+
+def plot_training(booster, evals_result, confusion, out_path, show=False):
+    """Learning curve, feature importance and confusion matrix in one figure."""
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # Create a figure with 3 subplots side by side
     fig, axes = plt.subplots(1, 3, figsize=(18, 5))
 
     # Plot 1: Learning Curve (Log Loss)
     # Check for overfitting or underfitting
-    results = model.evals_result()
-    epochs = len(results['validation_0']['logloss'])
-    x_axis = range(0, epochs)
-    axes[0].plot(x_axis, results['validation_0']['logloss'], label='Train')
-    axes[0].plot(x_axis, results['validation_1']['logloss'], label='Test')
+    x_axis = range(len(evals_result['train']['logloss']))
+    axes[0].plot(x_axis, evals_result['train']['logloss'], label='Train')
+    axes[0].plot(x_axis, evals_result['test']['logloss'], label='Test')
     axes[0].legend()
     axes[0].set_title('Log Loss (Learning Curve)')
     axes[0].set_xlabel('Epochs')
 
     # Plot 2: Feature Importance
-    # Define feature names explicitly for the plot
-    feature_names = ['Entropy', 'Length', 'Digit Ratio', 'Upper Ratio', 'Symbol Ratio', 'Prefix Score', 'Length Score']
-    
-    # Assign feature names to the booster object for correct labeling in the plot
-    model.get_booster().feature_names = feature_names
-    xgb.plot_importance(model, ax=axes[1], height=0.5, importance_type='weight', title='Feature Importance')
+    booster.feature_names = FEATURE_NAMES
+    xgb.plot_importance(booster, ax=axes[1], height=0.5, importance_type='weight', title='Feature Importance')
+    booster.feature_names = None
 
     # Plot 3: Confusion Matrix
     # Visualize True Positives, True Negatives, False Positives, and False Negatives
-    cm = confusion_matrix(y_test, y_pred)
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=axes[2])
+    sns.heatmap(confusion, annot=True, fmt='d', cmap='Blues', ax=axes[2])
     axes[2].set_title('Confusion Matrix')
     axes[2].set_xlabel('Predicted')
     axes[2].set_ylabel('Actual')
 
-    # Adjust layout and display the plots
     plt.tight_layout()
-    training_fig = os.path.join(os.path.dirname(__file__), 'training_Outcome.png')
-    plt.savefig(training_fig, dpi=300, bbox_inches='tight')
-    plt.show()
-
-    # Save the trained model to a JSON file
-    # Using the booster object ensures format compatibility
-    model_path = os.path.join(os.path.dirname(__file__), 'xgb_model.json')
-    model.get_booster().save_model(model_path)
-    print(f"Model saved to: {model_path}")
-    
\ No newline at end of file
+    plt.savefig(out_path, dpi=300, bbox_inches='tight')
+    print(f"Training plots saved to: {out_path}")
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Train the CodeSentry secret classifier")
+    parser.add_argument("--data", default=DEFAULT_DATASET,
+                        help="Training CSV with text,label columns, or a sharded dataset directory")
+    parser.add_argument("--samples", type=int, default=6000,
+                        help="Rows to generate when the dataset does not exist (default: 6000)")
+    parser.add_argument("--chunk-size", type=int, default=200000, help="Rows read and featurized per chunk")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) - 1),
+                        help="Featurization processes (default: CPU count - 1)")
+    parser.add_argument("--nthread", type=int, default=0, help="XGBoost threads (default: 0 = all cores)")
+    parser.add_argument("--rounds", type=int, default=100, help="Boosting rounds (default: 100)")
+    parser.add_argument("--max-depth", type=int, default=4, help="Tree depth (default: 4)")
+    parser.add_argument("--learning-rate", type=float, default=0.1, help="Learning rate (default: 0.1)")
+    parser.add_argument("--test-fraction", type=float, default=0.2, help="Held-out share of rows (default: 0.2)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the train/test split and a generated dataset (default: 42)")
+    parser.add_argument("--out", default=DEFAULT_MODEL, help="Model JSON path (default: ML/xgb_model.json)")
+    parser.add_argument("--plot", action="store_true", help="Save training plots next to the model")
+    parser.add_argument("--show", action="store_true", help="Also display the plots (implies --plot)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    timings = {}
+
+    # 1. Generation (only when there is no dataset yet)
+    start = time.perf_counter()
+    if not os.path.exists(args.data):
+        generate_dataset(args.samples, args.data, seed=args.seed)
+    timings['generation'] = time.perf_counter() - start
+
+    # 2. Featurization, streamed chunk by chunk
+    start = time.perf_counter()
+    X, y = featurize_dataset(iter_chunks(args.data, args.chunk_size), args.workers)
+    test = split(len(y), args.test_fraction, args.seed)
+    dtrain = xgb.DMatrix(X[~test], label=y[~test], nthread=args.nthread)
+    dtest = xgb.DMatrix(X[test], label=y[test], nthread=args.nthread)
+    timings['featurization'] = time.perf_counter() - start
+    print(f"Train: {dtrain.num_row()} | Test: {dtest.num_row()}")
+
+    # 3. Training
+    params = {
+        'objective': 'binary:logistic',
+        'tree_method': 'hist',
+        'max_depth': args.max_depth,
+        'eta': args.learning_rate,
+        'eval_metric': ['logloss', 'error'],
+        'nthread': args.nthread,
+        'seed': args.seed
+    }
+    evals_result = {}
+    start = time.perf_counter()
+    booster = xgb.train(params, dtrain, num_boost_round=args.rounds,
+                        evals=[(dtrain, 'train'), (dtest, 'test')], evals_result=evals_result, verbose_eval=False)
+    timings['training'] = time.perf_counter() - start
+
+    # 4. Evaluation on the held-out rows
+    start = time.perf_counter()
+    metrics = evaluate(y[test], booster.predict(dtest))
+    timings['eval'] = time.perf_counter() - start
+    print_report(metrics)
+
+    # Save the trained model, plus the flattened tree arrays for the scanners' NumPy evaluator
+    booster.save_model(args.out)
+    print(f"Model saved to: {args.out}")
+    npz_path = os.path.splitext(args.out)[0] + '.npz'
+    save_compiled(compile_model(args.out), npz_path)
+    print(f"Compiled trees saved to: {npz_path}")
+
+    if args.plot or args.show:
+        try:
+            plot_training(booster, evals_result, metrics['confusion'],
+                          os.path.join(os.path.dirname(os.path.abspath(args.out)), 'training_Outcome.png'), args.show)
+        except ImportError as e:
+            print(f"Plots skipped: {e}")
+
+    print("\nPhase timings:")
+    for phase, seconds in timings.items():
+        print(f"  {phase:<14}{seconds:>9.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Reproducible scan benchmark built on generate_test_data.py.
+
+For every corpus size a deterministic corpus is generated, scanned headlessly
+and compared with the generator's ground truth. Results are written as JSON so
+runs can be diffed across commits:
+
+    python checkingFile/benchmark.py --sizes 1000 10000 100000 --out bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generate_test_data import generate_corpus, LEAK_PROBABILITY, DEFAULT_SEED
+
+# Single-file scans timed for the latency percentiles
+LATENCY_SAMPLE = 1000
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def peak_rss_mb(who):
+    """Peak resident set size in MB (None where the resource module is unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def row_nbytes(row):
+    """Approximate size of one finding kept as a plain dict."""
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+
+
+def score_against_truth(findings, leaks):
+    truth = {(leak['path'], leak['line']): leak['risk'] for leak in leaks}
+    found = {(row['path'], row['line']) for row in findings}
+    hits = found & truth.keys()
+
+    recall_by_risk = {}
+    for risk in ("CRITICAL", "HIGH", "MEDIUM", "LOW"):
+        expected = [key for key, level in truth.items() if level == risk]
+        if expected:
+            recall_by_risk[risk] = round(sum(key in found for key in expected) / len(expected), 4)
+
+    return {
+        "precision": round(len(hits) / len(found), 4) if found else None,
+        "recall": round(len(hits) / len(truth), 4) if truth else None,
+        "recall_by_risk": recall_by_risk
+    }
+
+
+def run_benchmark(corpus_dir, leaks, workers, prefilter=True):
+    """Runs in a fresh process so peak RSS belongs to this corpus only."""
+    from main_function.scanner import ScanJob, collect_files, build_finding
+    from main_function.results import ResultStore
+    from main_function.detector import MLDetector
+    from main_function.tokenizer import extract_candidates, extract_pem_blocks
+    from main_function.reader import read_file
+
+    start = time.perf_counter()
+    detector = MLDetector(verbose=False, prefilter=prefilter)
+    load_seconds = time.perf_counter() - start
+
+    file_list = collect_files(corpus_dir)
+    total_bytes = sum(os.path.getsize(f) for f in file_list)
+
+    # Candidate count, measured outside the timed scan
+    candidates = 0
+    for filepath in file_list:
+        buffer = read_file(filepath)
+        candidates += len(extract_candidates(buffer, filepath)) + len(extract_pem_blocks(buffer))
+
+    start = time.perf_counter()
+    job = ScanJob(detector, workers=workers, use_cache=False, prefilter=prefilter)
+    findings = ResultStore()
+    for filepath, results in job.run(file_list):
+        findings.extend(build_finding(res, filepath) for res in results)
+    scan_seconds = time.perf_counter() - start
+    # Taken before the latency loop below reuses the detector
+    prediction_stats = job.prediction_stats()
+    prefilter_stats = job.prefilter_stats()
+
+    # Memory per finding: the columnar store vs. the plain row dicts it replaces
+    store_bytes = findings.nbytes()
+    dict_bytes = sum(row_nbytes(row) for row in findings)
+
+    # Per-file latency of single-file scans on an evenly spaced sample;
+    # a detector without the prediction cache, which the scan above has warmed
+    cold_detector = MLDetector(verbose=False, cache_size=0, prefilter=prefilter)
+    step = max(1, len(file_list) // LATENCY_SAMPLE)
+    latencies = []
+    for filepath in file_list[::step]:
+        t = time.perf_counter()
+        cold_detector.scan_file(filepath)
+        latencies.append((time.perf_counter() - t) * 1000)
+
+    result = {
+        "files": len(file_list),
+        "bytes": total_bytes,
+        "workers": workers,
+        "model_load_seconds": round(load_seconds, 4),
+        "scan_seconds": round(scan_seconds, 4),
+        "files_per_sec": round(len(file_list) / scan_seconds, 1),
+        "mb_per_sec": round(total_bytes / 1e6 / scan_seconds, 3),
+        "candidates": candidates,
+        "candidates_per_sec": round(candidates / scan_seconds, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "samples": len(latencies)
+        },
+        "peak_rss_mb": peak_rss_mb(0),
+        "peak_rss_children_mb": peak_rss_mb(-1),
+        "prediction_cache": prediction_stats,
+        "prefilter": prefilter_stats,
+        "findings": len(findings),
+        "bytes_per_finding": {
+            "store": round(store_bytes / len(findings), 1) if findings else None,
+            "dicts": round(dict_bytes / len(findings), 1) if findings else None
+        },
+        "leaks": len(leaks)
+    }
+    result.update(score_against_truth(findings, leaks))
+    return result
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CodeSentry scan benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Corpus sizes in files (default: 1000 10000 100000)")
+    parser.add_argument("--leak-rate", type=float, default=LEAK_PROBABILITY,
+                        help=f"Probability that a file contains a leak (default: {LEAK_PROBABILITY})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"Random seed (default: {DEFAULT_SEED})")
+    parser.add_argument("--workers", type=int, default=1, help="Scan worker processes (default: 1)")
+    parser.add_argument("--no-prefilter", action="store_true", help="Send every candidate to the model")
+    parser.add_argument("--work-dir", help="Where corpora are generated (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep generated corpora")
+    parser.add_argument("--out", default="bench_results.json", help="JSON results file (default: bench_results.json)")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="codesentry_bench_")
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "leak_rate": args.leak_rate,
+        "prefilter": not args.no_prefilter,
+        "runs": []
+    }
+
+    ctx = multiprocessing.get_context('spawn')
+    try:
+        for size in args.sizes:
+            corpus_dir = os.path.join(work_dir, f"corpus_{size}_{args.seed}")
+            if os.path.exists(corpus_dir):
+                shutil.rmtree(corpus_dir)
+
+            start = time.perf_counter()
+            truth = generate_corpus(corpus_dir, size, args.leak_rate, args.seed, verbose=False)
+            generate_seconds = time.perf_counter() - start
+
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                result = pool.submit(run_benchmark, corpus_dir, truth["leaks"], args.workers, not args.no_prefilter).result()
+            result["generate_seconds"] = round(generate_seconds, 2)
+            report["runs"].append(result)
+
+            print(f"{size:>7} files | {result['files_per_sec']:>9.1f} files/s | {result['mb_per_sec']:>7.3f} MB/s | "
+                  f"p50 {result['latency_ms']['p50']:.3f} ms p99 {result['latency_ms']['p99']:.3f} ms | "
+                  f"precision {result['precision']} recall {result['recall']} | "
+                  f"{result['bytes_per_finding']['store']} B/finding")
+            if result["prefilter"]:
+                print("        pre-filter: " + ", ".join(f"{name} {count}" for name, count in result["prefilter"].items()))
+
+            if not args.keep:
+                shutil.rmtree(corpus_dir, ignore_errors=True)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
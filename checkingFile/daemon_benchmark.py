@@ -0,0 +1,147 @@
+"""
+Throughput benchmark for the local scan daemon.
+
+Generates a corpus of small files, starts a daemon on a private socket and
+fires single-file scan requests from many concurrent clients. For reference
+the same files are also scanned by cold one-shot CLI processes:
+
+    python checkingFile/daemon_benchmark.py --files 2000 --clients 1 8 32 --out daemon_bench.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generate_test_data import generate_corpus, LEAK_PROBABILITY, DEFAULT_SEED
+from benchmark import percentile, git_commit
+from main_function.daemon import DaemonClient
+from main_function.scanner import collect_files
+
+# One-shot CLI runs timed for the cold-start comparison
+CLI_SAMPLE = 5
+
+
+def start_daemon(address, timeout=60):
+    process = subprocess.Popen([sys.executable, '-m', 'main_function.daemon', 'serve', '--socket', address],
+                               cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with DaemonClient(address, timeout=1) as client:
+                client.ping()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Daemon did not start")
+
+
+def run_clients(address, files, clients):
+    """Each client keeps one connection and scans its share of files one request at a time."""
+    def client_loop(share):
+        latencies = []
+        findings = 0
+        with DaemonClient(address) as client:
+            for filepath in share:
+                t = time.perf_counter()
+                findings += len(client.scan([filepath]))
+                latencies.append((time.perf_counter() - t) * 1000)
+        return latencies, findings
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client_loop, [files[i::clients] for i in range(clients)]))
+    seconds = time.perf_counter() - start
+
+    latencies = [ms for part, _ in results for ms in part]
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "seconds": round(seconds, 4),
+        "requests_per_sec": round(len(latencies) / seconds, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3)
+        },
+        "findings": sum(count for _, count in results)
+    }
+
+
+def time_cli(files):
+    """Wall time of one-shot `cli scan` processes on single-file directories."""
+    times = []
+    work = tempfile.mkdtemp(prefix="codesentry_cli_")
+    try:
+        for i, filepath in enumerate(files[:CLI_SAMPLE]):
+            single = os.path.join(work, str(i))
+            os.makedirs(single)
+            shutil.copy(filepath, single)
+            t = time.perf_counter()
+            subprocess.run([sys.executable, '-m', 'main_function.cli', 'scan', single, '--no-cache', '-w', '1',
+                            '-q', '--fail-on', 'NONE'], cwd=ROOT, stdout=subprocess.DEVNULL)
+            times.append((time.perf_counter() - t) * 1000)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {"runs": len(times), "p50_ms": round(percentile(times, 50), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CodeSentry daemon throughput benchmark")
+    parser.add_argument("--files", type=int, default=2000, help="Corpus size in files (default: 2000)")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32],
+                        help="Concurrent client counts (default: 1 8 32)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"Random seed (default: {DEFAULT_SEED})")
+    parser.add_argument("--out", default="daemon_bench.json", help="JSON results file (default: daemon_bench.json)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="codesentry_daemon_bench_")
+    address = os.path.join(work_dir, "daemon.sock")
+    corpus_dir = os.path.join(work_dir, "corpus")
+    report = {"commit": git_commit(), "cpu_count": os.cpu_count(), "files": args.files, "runs": []}
+
+    try:
+        generate_corpus(corpus_dir, args.files, LEAK_PROBABILITY, args.seed, verbose=False)
+        files = collect_files(corpus_dir)
+
+        t = time.perf_counter()
+        daemon = start_daemon(address)
+        report["daemon_start_seconds"] = round(time.perf_counter() - t, 2)
+        try:
+            for clients in args.clients:
+                result = run_clients(address, files, clients)
+                report["runs"].append(result)
+                print(f"{clients:>4} clients | {result['requests_per_sec']:>9.1f} req/s | "
+                      f"p50 {result['latency_ms']['p50']:.2f} ms p95 {result['latency_ms']['p95']:.2f} ms "
+                      f"p99 {result['latency_ms']['p99']:.2f} ms")
+            with DaemonClient(address) as client:
+                report["daemon_stats"] = client.stats()
+                client.shutdown()
+            daemon.wait(timeout=10)
+        finally:
+            if daemon.poll() is None:
+                daemon.kill()
+
+        report["cli_one_shot"] = time_cli(files)
+        print(f"one-shot CLI per file: p50 {report['cli_one_shot']['p50_ms']} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
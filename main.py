@@ -1,18 +1,20 @@
+import time
+# Taken before any other import so the startup report includes import time
+STARTUP_T0 = time.perf_counter()
+
 import sys
 import os
 import threading
-import csv
-import json
+import multiprocessing
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QTableView, QHeaderView,
     QTabWidget, QProgressBar, QFrame, QMessageBox, QComboBox,
-    QAbstractItemView
+    QAbstractItemView, QProgressDialog
 )
 from PyQt6.QtCore import (
-    Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex, 
-    QSortFilterProxyModel, QSize
+    Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex, QSize
 )
 from PyQt6.QtGui import QColor, QFont, QAction,QIcon
 
@@ -20,12 +22,27 @@ from PyQt6.QtGui import QColor, QFont, QAction,QIcon
 from resources.languages import LanguageManager
 from resources.styles import DARK_THEME_QSS
 
-try:
-    from main_function.detector import MLDetector
-except ImportError:
-    class MLDetector:
-        def __init__(self): self.model = True
-        def scan_line(self, line, idx): return []
+from main_function.scanner import ScanJob, FileStream, ModelLoadError, build_finding, DEFAULT_WORKERS
+from main_function.watcher import create_watcher
+from main_function.results import ResultStore, ResultView
+from main_function import report
+
+IMPORT_SECONDS = time.perf_counter() - STARTUP_T0
+
+
+def load_detector():
+    """
+    Imports the detector (numpy/xgboost) and loads the model.
+    Called from ModelLoader so the window can be shown first.
+    """
+    try:
+        from main_function.detector import MLDetector
+    except ImportError:
+        class MLDetector:
+            def __init__(self): self.model = True
+            def scan_line(self, line, idx): return []
+            def scan_files(self, paths, should_stop=None): return [(p, []) for p in paths]
+    return MLDetector()
 
 def resource_path(relative_path):
     if hasattr(sys, '_MEIPASS'):
@@ -37,29 +54,41 @@ def resource_path(relative_path):
 # Data Model (ResultModel)
  
 class ResultModel(QAbstractTableModel):
+    """
+    Table model over the columnar ResultStore. Sorting and the risk filter are
+    done by a ResultView on the store (no proxy models), and rows are handed to
+    the view FETCH_BATCH at a time as it scrolls (canFetchMore / fetchMore).
+    """
+    FETCH_BATCH = 1000
+    # Removals larger than this reset the table instead of signalling row by row
+    BULK_REMOVE = 64
+
     def __init__(self, data=None):
         super().__init__()
-        self._data = data or []
+        # Findings are kept column-wise; see main_function/results.py
+        self.store = ResultStore(data)
+        self.view = ResultView(self.store)
+        self.fetched = min(len(self.view), self.FETCH_BATCH)
         self._headers = ["col_risk", "col_file", "col_line", "col_content", "col_score", "col_time"]
 
     def data(self, index, role):
         if not index.isValid():
             return None
         
-        row_data = self._data[index.row()]
+        row = self.view.rows[index.row()]
         col = index.column()
+        store = self.store
 
         if role == Qt.ItemDataRole.DisplayRole:
-            key = self._headers[col]
-            if col == 0: return row_data['risk']
-            if col == 1: return row_data['file']
-            if col == 2: return str(row_data['line'])
-            if col == 3: return self.mask_secret(row_data['match']) # Apply masking
-            if col == 4: return f"{row_data['score']:.2f}%"
-            if col == 5: return row_data['timestamp']
+            if col == 0: return store.risk(row)
+            if col == 1: return store.file(row)
+            if col == 2: return str(store.line(row))
+            if col == 3: return self.mask_secret(store.match(row)) # Apply masking
+            if col == 4: return f"{store.score(row):.2f}%"
+            if col == 5: return store.timestamp(row)
 
         if role == Qt.ItemDataRole.ForegroundRole:
-            risk = row_data['risk']
+            risk = store.risk(row)
             if risk == 'CRITICAL': return QColor("#ff4444")
             if risk == 'HIGH': return QColor("#ff8800")
             if risk == 'MEDIUM': return QColor("#ffcc00")
@@ -74,7 +103,7 @@ class ResultModel(QAbstractTableModel):
         return None
 
     def rowCount(self, index=QModelIndex()):
-        return len(self._data)
+        return self.fetched
 
     def columnCount(self, index=QModelIndex()):
         return len(self._headers)
@@ -84,14 +113,120 @@ class ResultModel(QAbstractTableModel):
             return LanguageManager.get(self._headers[section])
         return None
 
-    def add_row(self, row_data):
-        self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount())
-        self._data.append(row_data)
+    # Lazy fetching
+    def canFetchMore(self, parent=QModelIndex()):
+        return self.fetched < len(self.view)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.FETCH_BATCH, len(self.view) - self.fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
         self.endInsertRows()
 
+    # Sorting and filtering on the store
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # column -1 (no sort indicator) restores insertion order
+        self.beginResetModel()
+        self.view.sort(ResultView.SORT_COLUMNS[column] if column >= 0 else None,
+                       order == Qt.SortOrder.DescendingOrder)
+        self.endResetModel()
+
+    def set_risk(self, risk):
+        """Shows every finding (None) or one risk level."""
+        self.beginResetModel()
+        self.view.risk = risk
+        self.fetched = min(len(self.view), self.FETCH_BATCH)
+        self.endResetModel()
+
+    # Row changes: only positions inside the fetched window are signalled
+    def _attach(self, index):
+        position = self.view.position(index)
+        if position is not None and position < self.fetched:
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.view.add(index)
+            self.fetched += 1
+            self.endInsertRows()
+        else:
+            self.view.add(index)
+
+    def _detach(self, index):
+        position = self.view.find(index)
+        if position is not None and position < self.fetched:
+            self.beginRemoveRows(QModelIndex(), position, position)
+            self.view.discard(index)
+            self.fetched -= 1
+            self.endRemoveRows()
+        else:
+            self.view.discard(index)
+
+    def add_row(self, row_data):
+        self.add_rows([row_data])
+
+    def add_rows(self, rows):
+        """Appends a batch of rows; in insertion order they land past the fetched window."""
+        if not rows:
+            return
+        first = len(self.store)
+        self.store.extend(rows)
+        for index in range(first, len(self.store)):
+            self._attach(index)
+        # Fill the first screen right away; the rest is fetched on scroll
+        if self.fetched < self.FETCH_BATCH:
+            self.fetchMore()
+
+    def update_file(self, path, rows):
+        """
+        Replaces the findings of one rescanned file: its existing rows are
+        overwritten first (and moved if their sort position changes), then
+        surplus rows removed or new ones appended.
+        """
+        old = self.store.indexes_of(path)
+        for index, row in zip(old, rows):
+            self._detach(index)
+            self.store.replace(index, row)
+            self._attach(index)
+        self.remove_indexes(old[len(rows):])
+        self.add_rows(rows[len(old):])
+
+    def remove_paths(self, paths):
+        """Removes the findings of deleted files (or of everything below deleted directories)."""
+        self.remove_indexes(sorted({index for path in paths for index in self.store.indexes_of(path)}))
+
+    def remove_indexes(self, indexes):
+        # One store deletion per contiguous run, last run first so earlier indexes stay valid
+        runs = []
+        for index in sorted(indexes):
+            if runs and runs[-1][1] == index:
+                runs[-1][1] = index + 1
+            else:
+                runs.append([index, index + 1])
+        if not runs:
+            return
+        # A few rows are taken out one by one so the table keeps its position;
+        # larger removals (a deleted directory) filter the order once and reset
+        bulk = len(indexes) > self.BULK_REMOVE
+        if bulk:
+            self.beginResetModel()
+        else:
+            for index in indexes:
+                self._detach(index)
+        for start, stop in reversed(runs):
+            self.store.remove_range(start, stop)
+        self.view.remove(runs)
+        if bulk:
+            self.fetched = min(self.fetched, len(self.view))
+            self.endResetModel()
+
+    def count(self, risk=None):
+        return self.view.count(risk)
+
     def clear(self):
         self.beginResetModel()
-        self._data = []
+        self.store.clear()
+        self.view.clear()
+        self.fetched = 0
         self.endResetModel()
 
     @staticmethod
@@ -100,22 +235,81 @@ class ResultModel(QAbstractTableModel):
         Masks sensitive parts of the string.
         Static method so it can be used by the Export function as well.
         """
-        if not text: return ""
-        if len(text) <= 8:
-            return text[:2] + "****"
-        return text[:4] + "********" + text[-4:]
+        return report.mask_secret(text)
     
     def get_all_data(self):
-        return self._data
+        """The ResultStore itself; iterating it yields finding dicts for the exporters."""
+        return self.store
 
  
 # Background Scanning Thread
  
 class ScanThread(QThread):
     progress_update = pyqtSignal(str, float)
-    result_found = pyqtSignal(dict)
+    results_found = pyqtSignal(list)
     scan_finished = pyqtSignal()
 
+    # Findings are delivered to the UI thread in batches: when this many are
+    # pending, or when FLUSH_INTERVAL seconds have passed since the last batch
+    BATCH_SIZE = 500
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(self, target_path, detector, chunk_size=64, workers=1, use_cache=True, instrument=False):
+        super().__init__()
+        self.target_path = target_path
+        self.detector = detector
+        self.job = ScanJob(detector, workers=workers, chunk_size=chunk_size, use_cache=use_cache,
+                           instrument=instrument)
+        self.is_running = True
+
+    def run(self):
+        # Files are enumerated on a background thread and scanned as they are found
+        stream = FileStream(self.target_path, lambda: self.is_running, skipped=self.job.skipped).start()
+
+        pending = []
+        last_flush = time.monotonic()
+        bytes_done = 0
+
+        # Unchanged files are replayed from the scan cache, the rest are scanned
+        try:
+            for filepath, results in self.job.run(stream, stream.stats):
+                if not self.is_running: break
+
+                st = stream.stats.pop(filepath, None)
+                bytes_done += st.st_size if st else 0
+                pending.extend(build_finding(res, filepath) for res in results)
+
+                # Progress and findings share the same throttle
+                now = time.monotonic()
+                if len(pending) >= self.BATCH_SIZE or now - last_flush >= self.FLUSH_INTERVAL:
+                    # Progress is by bytes; the total keeps growing until the walk is done
+                    self.progress_update.emit(os.path.basename(filepath), bytes_done / max(stream.bytes_found, 1))
+                    if pending:
+                        self.results_found.emit(pending)
+                        pending = []
+                    last_flush = now
+        except ModelLoadError as e:
+            # Reported as a stopped scan rather than a complete, clean one
+            print(f"Error: {e}", file=sys.stderr)
+            self.is_running = False
+
+        if pending:
+            self.results_found.emit(pending)
+        self.scan_finished.emit()
+
+    def stop(self):
+        self.is_running = False
+        self.job.cancel()
+
+# Background Watch Thread
+class WatchThread(QThread):
+    """
+    Watches the scanned folder and rescans only the files that change.
+    Bursts of saves are debounced by the watcher before anything is rescanned.
+    """
+    files_updated = pyqtSignal(list)   # [(path, rows), ...]
+    paths_removed = pyqtSignal(list)
+
     def __init__(self, target_path, detector):
         super().__init__()
         self.target_path = target_path
@@ -123,63 +317,131 @@ class ScanThread(QThread):
         self.is_running = True
 
     def run(self):
-        file_list = []
-        for root, dirs, files in os.walk(self.target_path):
-            if not self.is_running: break
-            dirs[:] = [d for d in dirs if d not in ['.git', 'venv', '__pycache__', 'node_modules', '.idea', '.vscode']]
-            
-            for f in files:
-                if f.lower().endswith(('.py', '.js', '.json', '.txt', '.md', '.env', '.yml', '.xml', '.html', '.properties')):
-                    file_list.append(os.path.join(root, f))
+        watcher = create_watcher(self.target_path)
+        try:
+            while self.is_running:
+                changes = watcher.wait(lambda: self.is_running)
+                if changes is None: break
+                changed, removed = changes
+
+                if removed:
+                    self.paths_removed.emit(sorted(removed))
+                if changed:
+                    scanned = self.detector.scan_files(sorted(changed), lambda: not self.is_running)
+                    if not self.is_running: break
+                    self.files_updated.emit([(path, [build_finding(res, path) for res in results])
+                                             for path, results in scanned])
+        finally:
+            watcher.close()
 
-        total_files = len(file_list)
-        if total_files == 0:
-            self.scan_finished.emit()
-            return
+    def stop(self):
+        self.is_running = False
 
-        for i, filepath in enumerate(file_list):
-            if not self.is_running: break
-
-            progress = (i + 1) / total_files
-            fname = os.path.basename(filepath)
-            self.progress_update.emit(fname, progress)
-
-            try:
-                if os.path.getsize(filepath) == 0: continue
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line_idx, line in enumerate(f, 1):
-                        results = self.detector.scan_line(line.strip(), line_idx)
-                        for res in results:
-                            data = {
-                                'risk': res['risk'].upper(),
-                                'file': fname,
-                                'path': filepath,
-                                'line': line_idx,
-                                'match': res['word'],
-                                'score': round(res['score'], 2),
-                                'timestamp': datetime.now().strftime('%H:%M:%S')
-                            }
-                            self.result_found.emit(data)
-            except Exception:
-                pass
+# Background Model Loading Thread
+class ModelLoader(QThread):
+    model_ready = pyqtSignal(object, float)
 
-        self.scan_finished.emit()
+    def run(self):
+        start = time.perf_counter()
+        detector = load_detector()
+        self.model_ready.emit(detector, time.perf_counter() - start)
+
+
+# Sidebar colour of the model status label
+MODEL_STATUS_COLORS = {"loading": "#aaaaaa", "loaded": "#2ecc71", "failed": "#e74c3c"}
+
+
+# Background Export Thread
+class ExportThread(QThread):
+    """
+    Streams the findings to a report file row by row, so exporting a large
+    result set neither blocks the UI nor builds the report in memory.
+    """
+    progress = pyqtSignal(int)
+    export_done = pyqtSignal(bool)   # False = cancelled
+    export_failed = pyqtSignal(str)
+
+    def __init__(self, rows, file_path, fmt):
+        super().__init__()
+        self.rows = rows
+        self.file_path = file_path
+        self.fmt = fmt
+        self.is_running = True
+
+    def run(self):
+        try:
+            completed = report.export(self.rows, self.file_path, self.fmt, progress=self.progress.emit,
+                                      should_stop=lambda: not self.is_running)
+        except Exception as e:
+            self.export_failed.emit(str(e))
+            return
+        self.export_done.emit(completed)
 
     def stop(self):
         self.is_running = False
 
+
 # Main Application Window
 class SecretHunterWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.detector = MLDetector()
+        # The model is loaded by ModelLoader once the window is up (see start_model_loading)
+        self.detector = None
         self.scan_thread = None
+        self.watch_thread = None
+        self.export_thread = None
+        # Watch updates that arrive while an export reads the store
+        self.deferred_updates = []
         self.scanning = False
+        self.first_paint = None
+        self.exit_when_ready = False # set by --startup-time
+        self.instrument = False # set by --instrument
         
         self.init_ui()
         self.apply_styles()
         self.retranslate_ui()
 
+    def start_model_loading(self):
+        self.model_loader = ModelLoader(self)
+        self.model_loader.model_ready.connect(self.on_model_ready)
+        self.model_loader.start()
+
+    def on_model_ready(self, detector, seconds):
+        self.detector = detector
+        # A scan may not start while an export is reading the results
+        self.btn_action.setEnabled(self.export_thread is None)
+        self.btn_watch.setEnabled(True)
+        self.retranslate_ui()
+        print(f"System: Startup - imports {IMPORT_SECONDS * 1000:.0f} ms, "
+              f"first paint {(self.first_paint or 0) * 1000:.0f} ms, "
+              f"model load {seconds * 1000:.0f} ms, "
+              f"ready {(time.perf_counter() - STARTUP_T0) * 1000:.0f} ms")
+        if self.exit_when_ready:
+            self.close()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_paint is None:
+            self.first_paint = time.perf_counter() - STARTUP_T0
+            # Start loading only after the first frame is on screen
+            self.start_model_loading()
+
+    def closeEvent(self, event):
+        # Let a pending model load finish so the thread isn't destroyed while running
+        if getattr(self, 'model_loader', None):
+            self.model_loader.wait()
+        self.stop_watching()
+        if self.export_thread:
+            self.export_thread.stop()
+            self.export_thread.wait()
+        super().closeEvent(event)
+
+    def model_state(self):
+        """'loading', 'loaded' or 'failed'."""
+        if self.detector is None:
+            return "loading"
+        return "loaded" if getattr(self.detector, 'model', None) else "failed"
+
     def init_ui(self):
         self.resize(1200, 800)
         
@@ -222,16 +484,31 @@ class SecretHunterWindow(QMainWindow):
         self.btn_action = QPushButton()
         self.btn_action.setObjectName("ActionButton")
         self.btn_action.clicked.connect(self.toggle_scan)
+        self.btn_action.setEnabled(False) # until the model has loaded
         sidebar_layout.addWidget(self.btn_action)
 
+        self.btn_watch = QPushButton()
+        self.btn_watch.setCheckable(True)
+        self.btn_watch.toggled.connect(self.toggle_watch)
+        self.btn_watch.setEnabled(False) # until the model has loaded
+        sidebar_layout.addWidget(self.btn_watch)
+
         self.btn_export = QPushButton()
         self.btn_export.clicked.connect(self.export_report)
         sidebar_layout.addWidget(self.btn_export)
 
+        self.lbl_workers = QLabel()
+        sidebar_layout.addWidget(self.lbl_workers)
+
+        self.combo_workers = QComboBox()
+        for count in range(1, (os.cpu_count() or 1) + 1):
+            self.combo_workers.addItem(str(count), count)
+        self.combo_workers.setCurrentIndex(DEFAULT_WORKERS - 1)
+        sidebar_layout.addWidget(self.combo_workers)
+
         sidebar_layout.addStretch()
 
         self.lbl_model_status = QLabel()
-        self.lbl_model_status.setStyleSheet(f"color: {'#2ecc71' if getattr(self.detector, 'model', None) else '#e74c3c'}")
         sidebar_layout.addWidget(self.lbl_model_status)
 
         main_layout.addWidget(sidebar)
@@ -257,10 +534,10 @@ class SecretHunterWindow(QMainWindow):
         content_layout.addWidget(self.tabs)
 
         self.source_model = ResultModel()
-        self.proxy_models = {}
         self.stat_labels = {}
+        self.tab_layouts = []
 
-        tab_configs = [
+        self.tab_configs = [
             ("tab_all", None),
             ("tab_critical", "CRITICAL"),
             ("tab_high", "HIGH"),
@@ -268,7 +545,7 @@ class SecretHunterWindow(QMainWindow):
             ("tab_low", "LOW")
         ]
 
-        for key, filter_str in tab_configs:
+        for key, filter_str in self.tab_configs:
             tab = QWidget()
             vbox = QVBoxLayout(tab)
             vbox.setContentsMargins(0, 10, 0, 0)
@@ -277,34 +554,34 @@ class SecretHunterWindow(QMainWindow):
             stat_lbl.setStyleSheet("color: #aaaaaa; font-weight: bold; margin-bottom: 5px;")
             vbox.addWidget(stat_lbl)
             self.stat_labels[key] = stat_lbl
+            self.tab_layouts.append(vbox)
 
-            table = QTableView()
-            table.setAlternatingRowColors(False)
-            table.setShowGrid(False)
-            table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-            table.verticalHeader().setVisible(False)
-            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
-            table.horizontalHeader().setStretchLastSection(True)
-            table.setSortingEnabled(True)
-
-            proxy = QSortFilterProxyModel(self)
-            proxy.setSourceModel(self.source_model)
-            proxy.setFilterKeyColumn(0)
-            if filter_str:
-                proxy.setFilterFixedString(filter_str)
-            
-            table.setModel(proxy)
-            table.setColumnWidth(0, 90)
-            table.setColumnWidth(1, 200)
-            table.setColumnWidth(2, 60)
-            table.setColumnWidth(3, 300)
-            table.setColumnWidth(4, 90)
-            
-            self.proxy_models[key] = proxy
-            vbox.addWidget(table)
-            
             self.tabs.addTab(tab, key)
 
+        # One table for every tab: it moves to the selected tab, and the model
+        # switches to that tab's precomputed row list instead of re-filtering
+        table = QTableView()
+        table.setAlternatingRowColors(False)
+        table.setShowGrid(False)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        # Uniform row heights: no per-row size hints are computed
+        table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.setModel(self.source_model)
+        # Findings stay in scan order until a column header is clicked
+        table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        table.setSortingEnabled(True)
+        table.setColumnWidth(0, 90)
+        table.setColumnWidth(1, 200)
+        table.setColumnWidth(2, 60)
+        table.setColumnWidth(3, 300)
+        table.setColumnWidth(4, 90)
+        self.table = table
+        self.tab_layouts[0].addWidget(table)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
         main_layout.addWidget(content_area)
 
     def apply_styles(self):
@@ -315,6 +592,8 @@ class SecretHunterWindow(QMainWindow):
         self.lbl_title.setText("CodeSentry")
         self.btn_select.setText(LanguageManager.get("select_folder"))
         self.btn_export.setText(LanguageManager.get("export_report"))
+        self.btn_watch.setText(LanguageManager.get("watch_changes"))
+        self.lbl_workers.setText(LanguageManager.get("workers"))
         self.lbl_path.setText(self.target_path if hasattr(self, 'target_path') else LanguageManager.get("no_folder"))
         
         if self.scanning:
@@ -322,9 +601,9 @@ class SecretHunterWindow(QMainWindow):
         else:
             self.btn_action.setText(LanguageManager.get("start_scan"))
 
-        self.lbl_model_status.setText(
-            LanguageManager.get("model_loaded") if getattr(self.detector, 'model', None) else LanguageManager.get("model_failed")
-        )
+        state = self.model_state()
+        self.lbl_model_status.setText(LanguageManager.get(f"model_{state}"))
+        self.lbl_model_status.setStyleSheet(f"color: {MODEL_STATUS_COLORS[state]}")
 
         keys = ["tab_all", "tab_critical", "tab_high", "tab_medium", "tab_low"]
         for i, key in enumerate(keys):
@@ -344,6 +623,8 @@ class SecretHunterWindow(QMainWindow):
             self.target_path = folder
             self.lbl_path.setText(folder)
             self.lbl_status.setText(LanguageManager.get("ready"))
+            # Results of the old folder are gone after the next scan; watch it from then on
+            self.stop_watching()
 
     def toggle_scan(self):
         if self.scanning:
@@ -359,6 +640,8 @@ class SecretHunterWindow(QMainWindow):
                 QMessageBox.warning(self, LanguageManager.get("app_title"), LanguageManager.get("no_folder"))
                 return
             
+            # The detector is not shared between threads: a full scan replaces watching
+            self.stop_watching()
             self.scanning = True
             self.source_model.clear()
             self.update_stats()
@@ -370,11 +653,13 @@ class SecretHunterWindow(QMainWindow):
             
             self.btn_select.setEnabled(False)
             self.combo_lang.setEnabled(False)
+            self.combo_workers.setEnabled(False)
             self.btn_export.setEnabled(False)
             
-            self.scan_thread = ScanThread(self.target_path, self.detector)
+            self.scan_thread = ScanThread(self.target_path, self.detector, workers=self.combo_workers.currentData(),
+                                          instrument=self.instrument)
             self.scan_thread.progress_update.connect(self.on_progress)
-            self.scan_thread.result_found.connect(self.on_result)
+            self.scan_thread.results_found.connect(self.on_results)
             self.scan_thread.scan_finished.connect(self.on_finished)
             self.scan_thread.start()
 
@@ -382,25 +667,37 @@ class SecretHunterWindow(QMainWindow):
         self.lbl_status.setText(f"{LanguageManager.get('scanning')} {filename}")
         self.progress_bar.setValue(int(val * 100))
 
-    def on_result(self, data):
-        self.source_model.add_row(data)
+    def on_results(self, rows):
+        self.source_model.add_rows(rows)
         self.update_stats()
 
+    def on_tab_changed(self, index):
+        self.tab_layouts[index].addWidget(self.table)
+        self.source_model.set_risk(self.tab_configs[index][1])
+
     def update_stats(self):
-        keys = ["tab_all", "tab_critical", "tab_high", "tab_medium", "tab_low"]
-        for key in keys:
-            count = self.proxy_models[key].rowCount()
+        for key, risk in self.tab_configs:
+            count = self.source_model.count(risk)
             text_fmt = LanguageManager.get("stat_label")
             self.stat_labels[key].setText(text_fmt.format(count))
 
     def on_finished(self):
         self.scanning = False
-        self.btn_action.setEnabled(True)
+        self.btn_action.setEnabled(self.detector is not None)
         self.btn_select.setEnabled(True)
         self.combo_lang.setEnabled(True)
+        self.combo_workers.setEnabled(True)
         self.btn_export.setEnabled(True)
 
         status_text = LanguageManager.get("scan_stopped") if self.scan_thread and not self.scan_thread.is_running else LanguageManager.get("scan_complete")
+        if self.scan_thread:
+            skipped = self.scan_thread.job.skip_stats()
+            if skipped.total_files():
+                status_text += " " + LanguageManager.get("skipped_summary").format(
+                    skipped.total_files(), report.format_bytes(skipped.total_bytes()))
+            if self.scan_thread.job.instrument:
+                print("System: Scan instrumentation")
+                print(self.scan_thread.job.instrument.summary())
         self.lbl_status.setText(status_text)
         
         self.btn_action.setText(LanguageManager.get("start_scan"))
@@ -410,6 +707,47 @@ class SecretHunterWindow(QMainWindow):
         
         if self.scan_thread and self.scan_thread.is_running:
              self.progress_bar.setValue(100)
+             if self.btn_watch.isChecked():
+                 self.start_watching()
+
+    # Watch Mode
+    def toggle_watch(self, checked):
+        if not checked:
+            self.stop_watching()
+        elif not self.scanning and hasattr(self, 'target_path') and self.target_path:
+            # Otherwise watching starts when the next complete scan finishes
+            self.start_watching()
+
+    def start_watching(self):
+        if self.watch_thread or self.detector is None:
+            return
+        self.watch_thread = WatchThread(self.target_path, self.detector)
+        self.watch_thread.files_updated.connect(self.on_files_updated)
+        self.watch_thread.paths_removed.connect(self.on_paths_removed)
+        self.watch_thread.start()
+        self.lbl_status.setText(LanguageManager.get("watching"))
+
+    def stop_watching(self):
+        if self.watch_thread:
+            self.watch_thread.stop()
+            self.watch_thread.wait()
+            self.watch_thread = None
+
+    def on_files_updated(self, updates):
+        if self.export_thread:
+            self.deferred_updates.append((self.on_files_updated, updates))
+            return
+        for path, rows in updates:
+            self.source_model.update_file(path, rows)
+        self.update_stats()
+        self.lbl_status.setText(LanguageManager.get("watch_updated").format(len(updates)))
+
+    def on_paths_removed(self, paths):
+        if self.export_thread:
+            self.deferred_updates.append((self.on_paths_removed, paths))
+            return
+        self.source_model.remove_paths(paths)
+        self.update_stats()
 
     # Export Feature
     def export_report(self):
@@ -422,60 +760,69 @@ class SecretHunterWindow(QMainWindow):
             self,
             LanguageManager.get("export_report"),
             f"security_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "CSV Files (*.csv);;JSON Files (*.json)"
+            "CSV Files (*.csv);;JSON Files (*.json);;JSON Lines (*.jsonl);;SARIF Files (*.sarif);;"
+            "Compressed (*.gz *.bz2 *.xz)"
         )
 
         if not file_path:
             return
 
-        try:
-            # === FIXED: Apply masking to exported data ===
-            # Create a copy or process on the fly to avoid modifying source data if not intended,
-            # though masking is usually irreversible for safety.
-            
-            if file_path.endswith('.json'):
-                # For JSON, we construct a new list with masked values
-                masked_data = []
-                for row in data:
-                    masked_row = row.copy()
-                    masked_row['match'] = ResultModel.mask_secret(row['match'])
-                    masked_data.append(masked_row)
-                
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(masked_data, f, ensure_ascii=False, indent=4)
-            else:
-                if not file_path.endswith('.csv'):
-                    file_path += '.csv'
-                
-                with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
-                    writer = csv.writer(f)
-                    headers = ["Risk", "File", "Path", "Line", "Confidence", "Time", "Match Content (Masked)"]
-                    writer.writerow(headers)
-                    for row in data:
-                        writer.writerow([
-                            row['risk'],
-                            row['file'],
-                            row.get('path', ''),
-                            row['line'],
-                            f"{row['score']:.2f}%",
-                            row['timestamp'],
-                            ResultModel.mask_secret(row['match']) # Apply Mask
-                        ])
-
-            QMessageBox.information(
-                self, 
-                LanguageManager.get("export_success"), 
-                LanguageManager.get("export_success_msg").format(file_path)
-            )
+        # The format comes from the extension (report.sarif.gz = compressed SARIF)
+        fmt = report.format_for_path(file_path)
+        if fmt == "csv" and not file_path.lower().endswith(('.csv',) + tuple(report.COMPRESSORS)):
+            file_path += '.csv'
+
+        # The report module masks every match before it is written
+        self.export_dialog = QProgressDialog(LanguageManager.get("exporting"), LanguageManager.get("cancel"),
+                                             0, len(data), self)
+        self.export_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_dialog.setMinimumDuration(500)
+        self.export_dialog.setValue(0)
+
+        # A new scan would clear the results the export is reading
+        self.btn_action.setEnabled(False)
+        self.btn_export.setEnabled(False)
+
+        self.export_thread = ExportThread(data, file_path, fmt)
+        self.export_thread.progress.connect(self.export_dialog.setValue)
+        self.export_dialog.canceled.connect(self.export_thread.stop)
+        self.export_thread.export_done.connect(lambda completed: self.on_export_done(file_path, completed))
+        self.export_thread.export_failed.connect(self.on_export_failed)
+        self.export_thread.start()
+
+    def end_export(self):
+        self.export_thread.wait()
+        self.export_thread = None
+        self.export_dialog.reset()
+        self.btn_action.setEnabled(self.detector is not None)
+        self.btn_export.setEnabled(True)
+        # Apply watch updates held back while the store was being read
+        updates, self.deferred_updates = self.deferred_updates, []
+        for handler, arg in updates:
+            handler(arg)
+
+    def on_export_done(self, file_path, completed):
+        self.end_export()
+        if not completed:
+            self.lbl_status.setText(LanguageManager.get("export_cancelled"))
+            return
+        QMessageBox.information(
+            self, 
+            LanguageManager.get("export_success"), 
+            LanguageManager.get("export_success_msg").format(file_path)
+        )
 
-        except Exception as e:
-            QMessageBox.critical(
-                self, 
-                LanguageManager.get("export_error"), 
-                str(e)
-            )
+    def on_export_failed(self, message):
+        self.end_export()
+        QMessageBox.critical(
+            self, 
+            LanguageManager.get("export_error"), 
+            message
+        )
 
 if __name__ == "__main__":
+    # Required for the scan worker processes in the PyInstaller build
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon(resource_path("resources/img/icon.ico")))
     default_font = QFont("Segoe UI", 10)
@@ -487,5 +834,9 @@ if __name__ == "__main__":
     except ImportError:
         pass
     window = SecretHunterWindow()
+    # `python main.py --startup-time` prints the startup report and exits once the model is ready
+    window.exit_when_ready = "--startup-time" in sys.argv
+    # `--instrument` prints counters, time per stage and the slowest files after every scan
+    window.instrument = "--instrument" in sys.argv
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+asyncio scanning pipeline for embedding the scanner in async services.
+
+    from main_function.async_scan import scan
+
+    async for finding in scan("/path/to/repo"):
+        print(finding["risk"], finding["path"], finding["line"])
+
+Stages run as tasks connected by bounded queues, so a slow consumer
+throttles everything upstream:
+
+    enumerate -> read -> extract + batch-score -> emit
+
+Directory walking and file reads run on a thread pool; candidate extraction
+and scoring run one batch at a time on a dedicated thread, since an
+MLDetector (and its caches) must not be used by two threads at once.
+Findings are the same row dicts the GUI and CLI use (see build_finding).
+A QThread can consume the same API by running it under asyncio.run().
+
+A consumer that stops early should close the iterator (contextlib.aclosing
+or aclose()); that waits until the scoring thread has let go of the detector.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .reader import LARGE_FILE, SkipCounter, read_file
+from .scanner import iter_files, build_finding, ModelLoadError, DEFAULT_MAX_FILE_SIZE
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+# Paths pulled from the directory walk per thread-pool round trip
+ENUM_BATCH = 256
+
+
+class AsyncScanner:
+    """
+    One asynchronous scan of a directory; iterate it with `async for`.
+    After (or during) iteration, files_done / bytes_done / skipped describe
+    the progress.
+    Raises ModelLoadError when the detector has no model.
+    """
+
+    def __init__(self, target_path, detector=None, batch_size=64, readers=4, queue_size=256,
+                 max_size=DEFAULT_MAX_FILE_SIZE, use_ignore_files=True):
+        self.target_path = target_path
+        self.detector = detector
+        self.batch_size = batch_size
+        self.readers = readers
+        self.queue_size = queue_size
+        self.filters = {'max_size': max_size, 'use_ignore_files': use_ignore_files}
+        self.skipped = SkipCounter()
+        self.files_done = 0
+        self.bytes_done = 0
+        self._stopped = False
+
+    def __aiter__(self):
+        return self._run()
+
+    async def _run(self):
+        io_pool = ThreadPoolExecutor(max_workers=self.readers)
+        score_pool = ThreadPoolExecutor(max_workers=1)
+        findings = asyncio.Queue(self.queue_size)
+        pipeline = asyncio.ensure_future(self._pipeline(io_pool, score_pool, findings))
+        try:
+            while True:
+                if pipeline.done():
+                    # Re-raises the first stage failure, if any
+                    pipeline.result()
+                    item = await findings.get()
+                else:
+                    getter = asyncio.ensure_future(findings.get())
+                    await asyncio.wait({getter, pipeline}, return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done():
+                        getter.cancel()
+                        continue
+                    item = getter.result()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Also reached when the consumer stops iterating early
+            self._stopped = True
+            pipeline.cancel()
+            try:
+                await pipeline
+            except (asyncio.CancelledError, Exception):
+                pass
+            io_pool.shutdown(wait=False, cancel_futures=True)
+            # A scan_files() call already on the scoring thread sees the stop flag
+            # between files; wait for it so nothing touches the detector after we return
+            score_pool.shutdown(wait=False, cancel_futures=True)
+            await asyncio.get_running_loop().run_in_executor(None, score_pool.shutdown)
+            if self.detector is not None and hasattr(self.detector, 'skipped'):
+                self.skipped.merge(self.detector.skipped)
+
+    async def _pipeline(self, io_pool, score_pool, findings):
+        loop = asyncio.get_running_loop()
+        if self.detector is None:
+            from .detector import MLDetector
+            self.detector = await loop.run_in_executor(score_pool, lambda: MLDetector(verbose=False))
+        elif hasattr(self.detector, 'skipped'):
+            # A detector reused across scans counts this scan's skips only
+            self.detector.skipped = SkipCounter()
+        if self.detector.model is None:
+            # Without this the scan would finish cleanly with no findings
+            raise ModelLoadError("The model could not be loaded")
+
+        paths = asyncio.Queue(self.queue_size)
+        entries = asyncio.Queue(self.queue_size)
+        await asyncio.gather(
+            self._enumerate(io_pool, paths),
+            *(self._read(io_pool, paths, entries) for _ in range(self.readers)),
+            self._score(score_pool, entries, findings)
+        )
+
+    async def _enumerate(self, io_pool, paths):
+        loop = asyncio.get_running_loop()
+        walk = iter_files(self.target_path, lambda: not self._stopped, skipped=self.skipped, **self.filters)
+
+        def next_batch():
+            return [item for _, item in zip(range(ENUM_BATCH), walk)]
+
+        while True:
+            batch = await loop.run_in_executor(io_pool, next_batch)
+            for item in batch:
+                await paths.put(item)
+            if len(batch) < ENUM_BATCH:
+                break
+        for _ in range(self.readers):
+            await paths.put(_DONE)
+
+    async def _read(self, io_pool, paths, entries):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await paths.get()
+            if item is _DONE:
+                await entries.put(_DONE)
+                return
+            filepath, st = item
+            if st.st_size >= LARGE_FILE:
+                # Large files are memory-mapped by the detector instead of read here
+                await entries.put((filepath, st.st_size))
+            else:
+                buffer = await loop.run_in_executor(io_pool, read_file, filepath)
+                await entries.put(((filepath, buffer), st.st_size))
+
+    async def _score(self, score_pool, entries, findings):
+        loop = asyncio.get_running_loop()
+        readers_left = self.readers
+        while readers_left:
+            # Wait for one entry, then take whatever else is already queued
+            batch = []
+            item = await entries.get()
+            while True:
+                if item is _DONE:
+                    readers_left -= 1
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size or entries.empty() or not readers_left:
+                    break
+                item = entries.get_nowait()
+            if not batch:
+                continue
+
+            scanned = await loop.run_in_executor(score_pool, self.detector.scan_files, [entry for entry, _ in batch],
+                                                 lambda: self._stopped)
+            for (filepath, results), (_, size) in zip(scanned, batch):
+                self.files_done += 1
+                self.bytes_done += size
+                for res in results:
+                    await findings.put(build_finding(res, filepath))
+        await findings.put(_DONE)
+
+
+def scan(target_path, detector=None, **options):
+    """`async for finding in scan(path)`; options as for AsyncScanner."""
+    return AsyncScanner(target_path, detector, **options)
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+from .report import mask_secret
+
+DEFAULT_MODEL_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ML', 'xgb_model.json'))
+
+# Bump whenever candidate extraction or model evaluation changes so cached findings are rescanned
+SCANNER_VERSION = 6
+
+
+def default_cache_dir():
+    """Per-user cache directory (LOCALAPPDATA on Windows, XDG_CACHE_HOME elsewhere)."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        return os.path.join(base, 'CodeSentry', 'cache')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'codesentry')
+
+
+def file_digest(filepath):
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def compiled_model_path(model_path):
+    """
+    The .npz export TreeEnsemble.load() scores with instead of `model_path`,
+    or None. Same rule as the loader: used when it is at least as new as the JSON.
+    """
+    npz_path = os.path.splitext(model_path)[0] + '.npz'
+    try:
+        if os.path.getmtime(npz_path) >= os.path.getmtime(model_path):
+            return npz_path
+    except OSError:
+        pass
+    return None
+
+
+def model_fingerprint(model_path=DEFAULT_MODEL_PATH):
+    """Identifies the model (and scanner) that produced cached findings."""
+    try:
+        fingerprint = f"{SCANNER_VERSION}:{file_digest(model_path)}"
+        # A regenerated or replaced export changes the scores on its own
+        npz_path = compiled_model_path(model_path)
+        if npz_path:
+            fingerprint += ":" + file_digest(npz_path)
+        return fingerprint
+    except OSError:
+        return "missing"
+
+
+class ScanCache:
+    """
+    On-disk cache of per-file findings, keyed by path + size + mtime.
+
+    Entries are only valid for the model that produced them: opening the cache
+    with a different xgb_model.json (or .npz export) drops every entry. They
+    are also tied to the detector `options` that affect findings (e.g.
+    sniff_content, which skips binary or minified files unscanned), so a run
+    with other options rescans instead of replaying results it would not have
+    produced. With `use_hash` enabled a file whose mtime changed but whose
+    content did not is still served from the cache. Only masked matches are stored so no secret is ever written to disk.
+    """
+
+    def __init__(self, db_path=None, model_path=DEFAULT_MODEL_PATH, use_hash=False, options=None):
+        if db_path is None:
+            cache_dir = default_cache_dir()
+            os.makedirs(cache_dir, exist_ok=True)
+            db_path = os.path.join(cache_dir, 'scan_cache.sqlite')
+
+        self.use_hash = use_hash
+        self.model_version = model_fingerprint(model_path)
+        # Per-entry version: the model plus the options the findings were produced with
+        self.entry_version = self.model_version
+        if options:
+            self.entry_version += ":" + json.dumps(options, sort_keys=True)
+        self.hits = 0
+        self.misses = 0
+        self._entries = None
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "content_hash TEXT, model_version TEXT, findings TEXT)"
+        )
+
+        # Automatic invalidation when the model file changes
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'model_version'").fetchone()
+        if row is None or row[0] != self.model_version:
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('model_version', ?)", (self.model_version,))
+        self.conn.commit()
+
+    def lookup(self, filepath, st=None):
+        """
+        Returns (cached_results, stat_result); cached_results is None on a miss.
+        The stat result is reused by store() so each file is stat'ed once;
+        pass `st` when the caller already has one (e.g. from os.scandir).
+        """
+        filepath = os.path.abspath(filepath)
+        if st is None:
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                return None, None
+
+        # One query for the whole table instead of one per file
+        if self._entries is None:
+            self._entries = {
+                row[0]: row[1:] for row in self.conn.execute(
+                    "SELECT path, size, mtime_ns, content_hash, findings FROM files WHERE model_version = ?",
+                    (self.entry_version,)
+                )
+            }
+
+        row = self._entries.get(filepath)
+        if row is not None:
+            size, mtime_ns, content_hash, findings = row
+            if size == st.st_size and mtime_ns == st.st_mtime_ns:
+                self.hits += 1
+                return json.loads(findings), st
+            if self.use_hash and size == st.st_size and content_hash:
+                try:
+                    digest = file_digest(filepath)
+                except OSError:
+                    digest = None
+                if digest == content_hash:
+                    self.conn.execute("UPDATE files SET mtime_ns = ? WHERE path = ?", (st.st_mtime_ns, filepath))
+                    self.hits += 1
+                    return json.loads(findings), st
+
+        self.misses += 1
+        return None, st
+
+    def store(self, filepath, results, st=None):
+        filepath = os.path.abspath(filepath)
+        try:
+            st = st or os.stat(filepath)
+            content_hash = file_digest(filepath) if self.use_hash else None
+        except OSError:
+            return
+
+        masked = [dict(res, word=mask_secret(res['word'])) for res in results]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (filepath, st.st_size, st.st_mtime_ns, content_hash, self.entry_version, json.dumps(masked))
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,258 @@
+"""
+Headless command-line scanner for CI pipelines.
+
+Usage:
+    python -m main_function.cli scan PATH [--format csv|json|jsonl|sarif] [--output FILE]
+                                          [--workers N] [--max-size MB] [--fail-on LEVEL] [--stream]
+                                          [--instrument] [--instrument-json FILE] [--profile FILE]
+    python -m main_function.cli git [--repo DIR] (--staged | --range A..B | --history)
+                                    [--format ...] [--output FILE] [--fail-on LEVEL] [--stream]
+
+An --output name ending in .gz, .bz2 or .xz is written compressed.
+
+Exit codes: 0 = nothing at or above the --fail-on level, 1 = findings at or
+above it, 2 = usage, git or model loading error.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+# Only light modules here: the detector (numpy) is imported lazily once a scan really starts
+from .scanner import ScanJob, FileStream, ModelLoadError, build_finding, RISK_LEVELS, DEFAULT_WORKERS, DEFAULT_MAX_FILE_SIZE
+from .cache import DEFAULT_MODEL_PATH
+from .instrument import Profiler
+from . import report
+
+EXIT_OK = 0
+EXIT_FINDINGS = 1
+EXIT_ERROR = 2
+
+# Report formats written as one document (no trailing newline of their own)
+DOCUMENT_FORMATS = ("json", "sarif")
+
+STREAM_HELP = "Write each finding as soon as it is found (unsorted) instead of a sorted report at the end"
+
+
+def output_options():
+    """Report and exit-code options shared by every sub-command (an argparse parent)."""
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("-f", "--format", choices=sorted(report.WRITERS), default="csv",
+                        help="Report format (default: csv)")
+    output.add_argument("-o", "--output", help="Report file, compressed if it ends in .gz/.bz2/.xz "
+                                                "(default: standard output)")
+    output.add_argument("--fail-on", choices=RISK_LEVELS + ["NONE"], default="HIGH", type=str.upper,
+                        help="Exit with 1 if any finding is at or above this level (default: HIGH)")
+    output.add_argument("-q", "--quiet", action="store_true", help="Do not print the summary")
+    return output
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="codesentry", description="CodeSentry headless secret scanner")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    output = output_options()
+
+    scan = subparsers.add_parser("scan", parents=[output], help="Scan a directory for potential secrets")
+    scan.add_argument("path", help="Directory to scan")
+    scan.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                      help=f"Worker processes (default: {DEFAULT_WORKERS})")
+    scan.add_argument("--no-cache", action="store_true",
+                      help="Rescan every file instead of replaying findings for unchanged files")
+    scan.add_argument("--cache-file", help="Scan cache database (default: per-user cache directory)")
+    scan.add_argument("--max-size", type=float, default=DEFAULT_MAX_FILE_SIZE / (1 << 20),
+                      help=f"Skip files larger than this many MB, 0 = no limit (default: {DEFAULT_MAX_FILE_SIZE >> 20})")
+    scan.add_argument("--no-ignore", action="store_true", help="Do not honor .gitignore / .codesentryignore")
+    scan.add_argument("--no-sniff", action="store_true", help="Also scan binary and minified content")
+    scan.add_argument("--stream", action="store_true", help=STREAM_HELP)
+    scan.add_argument("--instrument", action="store_true",
+                      help="Print counters, time per stage and the slowest files after the scan")
+    scan.add_argument("--instrument-json", metavar="FILE", help="Also write the instrumentation as JSON (implies --instrument)")
+    scan.add_argument("--profile", metavar="FILE",
+                      help="Write a cProfile (pstats) profile of the scan; workers are not profiled, so use -w 1 "
+                           "(or attach py-spy to the worker processes instead)")
+
+    git = subparsers.add_parser("git", parents=[output], help="Scan lines added in git diffs or the whole history")
+    git.add_argument("--repo", default=".", help="Repository to scan (default: current directory)")
+    mode = git.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--staged", action="store_true", help="Lines added in the index (pre-commit)")
+    mode.add_argument("--range", metavar="A..B", help="Lines added by every commit in a revision range")
+    mode.add_argument("--history", action="store_true", help="Every reachable blob once, deduplicated by SHA")
+    git.add_argument("--stream", action="store_true", help=STREAM_HELP)
+    return parser
+
+
+def check_model():
+    if not os.path.exists(DEFAULT_MODEL_PATH):
+        print(f"Error: Model file not found at {DEFAULT_MODEL_PATH}", file=sys.stderr)
+        return False
+    return True
+
+
+def run_scan(args):
+    if not os.path.isdir(args.path):
+        print(f"Error: {args.path} is not a directory", file=sys.stderr)
+        return EXIT_ERROR
+    if not check_model():
+        return EXIT_ERROR
+
+    start = time.perf_counter()
+    job = ScanJob(workers=args.workers, use_cache=not args.no_cache, cache_path=args.cache_file,
+                  sniff_content=not args.no_sniff, instrument=args.instrument or bool(args.instrument_json))
+    # Enumeration runs on a background thread while the first files are scanned
+    stream = FileStream(args.path, max_size=int(args.max_size * (1 << 20)),
+                        use_ignore_files=not args.no_ignore, skipped=job.skipped)
+    try:
+        with Profiler(args.profile) if args.profile else contextlib.nullcontext():
+            stream.start()
+            # SARIF locations are relative to the scanned root
+            with ReportSink(args, {"base_path": args.path} if args.format == "sarif" else {}) as sink:
+                for filepath, results in job.run(stream, stream.stats):
+                    stream.stats.pop(filepath, None)
+                    for res in results:
+                        sink.add(build_finding(res, filepath))
+    except ModelLoadError as e:
+        # Nothing was scanned; a clean exit code would pass CI without a scan
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    if args.profile and not args.quiet:
+        print(f"Profile written to {args.profile}", file=sys.stderr)
+
+    summary = f"Scanned {stream.files_found} files ({job.cache_hits} from cache)"
+    stats = job.prediction_stats()
+    if stats and stats['hit_rate'] is not None:
+        summary += f", prediction cache hit rate {stats['hit_rate']:.1%}"
+    skipped = job.skip_stats()
+    if skipped.total_files():
+        summary += f", skipped {skipped.total_files()} files ({report.format_bytes(skipped.total_bytes())})"
+    if job.instrument:
+        report_instrumentation(args, job.instrument, time.perf_counter() - start)
+    return finish(args, sink.counts, summary, start)
+
+
+def report_instrumentation(args, instrument, elapsed):
+    print(f"Instrumentation (wall time {elapsed:.2f}s):", file=sys.stderr)
+    print(instrument.summary(), file=sys.stderr)
+    if args.instrument_json:
+        instrument.export(args.instrument_json, wall_seconds=round(elapsed, 6), workers=args.workers)
+        print(f"Instrumentation written to {args.instrument_json}", file=sys.stderr)
+
+
+def run_git(args):
+    if not check_model():
+        return EXIT_ERROR
+
+    from .detector import MLDetector
+    from .git_scan import GitScanner
+
+    start = time.perf_counter()
+    detector = MLDetector(verbose=False)
+    if not detector.model:
+        return EXIT_ERROR
+    scanner = GitScanner(detector, args.repo)
+
+    if args.staged:
+        findings, summary = scanner.scan_staged(), "Scanned staged changes"
+    elif args.history:
+        findings, summary = scanner.scan_history(), "Scanned full history"
+    else:
+        findings, summary = scanner.scan_range(args.range), f"Scanned {args.range}"
+    try:
+        with ReportSink(args, {}) as sink:
+            for row in findings:
+                sink.add(row)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    return finish(args, sink.counts, summary, start)
+
+
+class ReportSink:
+    """
+    Takes findings as they are produced. They are kept and written as one
+    sorted report at the end, or with --stream written to the report right
+    away, so only the per-risk counts stay in memory.
+    """
+
+    def __init__(self, args, writer_kwargs):
+        self.args = args
+        self.writer_kwargs = writer_kwargs
+        self.counts = count_risks([])
+        self.findings = []
+        self.stream = open_output(args, writer_kwargs) if getattr(args, 'stream', False) else None
+
+    def add(self, row):
+        self.counts[row['risk']] = self.counts.get(row['risk'], 0) + 1
+        if self.stream:
+            self.stream.write(row)
+        else:
+            self.findings.append(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if self.stream:
+            # Also on errors, so a streamed report stays well-formed with what was found so far
+            close_output(self.args, self.stream)
+        elif exc_type is None:
+            write_report(self.args, self.findings, self.writer_kwargs)
+
+
+def open_output(args, writer_kwargs):
+    if args.output:
+        return report.open_report(args.output, args.format, **writer_kwargs)
+    stream_class, _ = report.STREAMS[args.format]
+    return stream_class(sys.stdout, **writer_kwargs)
+
+
+def close_output(args, stream):
+    stream.close()
+    # The JSON array and SARIF log end without a newline; csv and jsonl rows already end with one
+    if not args.output and args.format in DOCUMENT_FORMATS:
+        sys.stdout.write("\n")
+
+
+def write_report(args, findings, writer_kwargs):
+    # Report order is stable regardless of worker completion order
+    findings.sort(key=lambda row: (row['path'], row['line']))
+
+    stream = open_output(args, writer_kwargs)
+    for row in findings:
+        stream.write(row)
+    close_output(args, stream)
+
+
+def count_risks(findings):
+    counts = {level: 0 for level in RISK_LEVELS}
+    for row in findings:
+        counts[row['risk']] = counts.get(row['risk'], 0) + 1
+    return counts
+
+
+def finish(args, counts, summary, start):
+    """Prints the summary line (with the per-risk `counts`) and returns the exit code for --fail-on."""
+
+    if not args.quiet:
+        elapsed = time.perf_counter() - start
+        levels = ", ".join(f"{level}: {counts[level]}" for level in RISK_LEVELS)
+        print(f"{summary} in {elapsed:.2f}s | {levels}", file=sys.stderr)
+
+    if args.fail_on == "NONE":
+        return EXIT_OK
+    failing = RISK_LEVELS[:RISK_LEVELS.index(args.fail_on) + 1]
+    return EXIT_FINDINGS if any(counts[level] for level in failing) else EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "scan":
+        return run_scan(args)
+    if args.command == "git":
+        return run_git(args)
+    return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,477 @@
+"""
+Local scan daemon: keeps one loaded MLDetector (and its warm prediction
+cache) resident so editor plugins and pre-commit hooks skip the model load.
+
+Usage:
+    python -m main_function.daemon serve [--socket PATH | --port N]
+    python -m main_function.daemon scan FILE_OR_DIR... [--format ...] [--fail-on LEVEL]
+    python -m main_function.daemon stats | stop
+
+The daemon listens on a Unix domain socket (a localhost TCP port where Unix
+sockets are unavailable, or with --port). The socket lives in a private
+per-user directory ($XDG_RUNTIME_DIR when set) and has mode 0600; clients
+refuse sockets owned by another user. Over TCP every request must carry the
+"token" the daemon writes to a 0600 file in that directory (DaemonClient
+reads it automatically).
+
+The protocol is one JSON object per line in each direction; a connection may
+send any number of requests:
+
+    {"op": "scan", "paths": ["/abs/file.py", "/abs/dir"]}
+    {"op": "scan_text", "name": "unsaved.py", "content": "..."}
+    {"op": "ping"} | {"op": "stats"} | {"op": "shutdown"}
+
+Replies are {"ok": true, ...} or {"ok": false, "error": "..."}. Scan replies
+carry "findings" as the same row dicts the GUI and CLI use, with "match"
+masked like the report exports unless the request sets "unmasked": true.
+
+Requests from concurrent clients are queued and merged into a single
+scan_files() call, so many small requests share one model invocation.
+"""
+import argparse
+import hmac
+import json
+import os
+import queue
+import secrets
+import socket
+import stat
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+from .scanner import collect_files, build_finding
+from .report import mask_secret
+from . import cli
+
+# Used instead of a Unix socket on platforms without AF_UNIX
+DEFAULT_PORT = 47291
+
+# Files merged into one scan_files() call at most
+BATCH_LIMIT = 256
+
+# Longest request line accepted (scan_text content included)
+MAX_REQUEST = 16 << 20
+
+
+def runtime_dir():
+    """Private per-user directory for the socket and the TCP token file."""
+    if not hasattr(os, 'getuid'):
+        return os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser("~"), "CodeSentry")
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], "codesentry")
+    return os.path.join(tempfile.gettempdir(), f"codesentry-{os.getuid()}")
+
+
+def check_owner(path, private=False):
+    """
+    Raises PermissionError unless `path` belongs to the current user (and,
+    with `private`, is closed to group and others). The temp directory is
+    shared, so another user could have created the path first.
+    """
+    if not hasattr(os, 'getuid'):
+        return
+    info = os.lstat(path)
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    if private and info.st_mode & 0o077:
+        raise PermissionError(f"{path} is accessible by other users")
+
+
+def private_dir():
+    """Creates runtime_dir() with mode 0700 if needed and checks it."""
+    path = runtime_dir()
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not stat.S_ISDIR(os.lstat(path).st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    check_owner(path, private=True)
+    return path
+
+
+def default_address():
+    """Per-user socket path, or a localhost (host, port) pair without AF_UNIX."""
+    if hasattr(socket, 'AF_UNIX'):
+        return os.path.join(runtime_dir(), "daemon.sock")
+    return ("127.0.0.1", DEFAULT_PORT)
+
+
+def token_path(port):
+    return os.path.join(runtime_dir(), f"daemon-{port}.token")
+
+
+def read_token(port):
+    path = token_path(port)
+    check_owner(path, private=True)
+    with open(path, encoding='utf-8') as f:
+        return f.read().strip()
+
+
+class _Pending:
+    """One request's files waiting for the scoring thread."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_REQUEST + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST:
+                self._reply({"ok": False, "error": "Request too large"})
+                return
+            try:
+                request = json.loads(line)
+                reply = self.server.daemon.handle(request)
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self._reply(reply)
+
+    def _reply(self, reply):
+        self.wfile.write(json.dumps(reply).encode('utf-8') + b"\n")
+        self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ScanDaemon:
+    """
+    Serves scan requests with one resident detector.
+
+    Connection threads only parse and queue requests; a single scoring thread
+    owns the detector, drains the queue and scans everything pending at once.
+    """
+
+    def __init__(self, detector, address=None):
+        self.detector = detector
+        self.address = address or default_address()
+        # Required on every TCP request; any local user can reach a TCP port
+        self.token = secrets.token_hex(32) if isinstance(self.address, tuple) else None
+        self.pending = queue.Queue()
+        self.started = time.time()
+        self.requests = 0
+        self.files = 0
+        self.batches = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    # ---- scoring thread ----
+
+    def _score_loop(self):
+        while True:
+            first = self.pending.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first.entries)
+            # Merge whatever else arrived while the previous batch was scanned
+            while size < BATCH_LIMIT:
+                try:
+                    item = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.pending.put(None)
+                    break
+                batch.append(item)
+                size += len(item.entries)
+
+            try:
+                scanned = self.detector.scan_files([entry for item in batch for entry in item.entries])
+            except Exception as e:
+                for item in batch:
+                    item.error = str(e)
+                    item.done.set()
+                continue
+
+            self.batches += 1
+            self.files += len(scanned)
+            start = 0
+            for item in batch:
+                item.results = scanned[start:start + len(item.entries)]
+                start += len(item.entries)
+                item.done.set()
+
+    def _scan(self, entries, unmasked=False):
+        item = _Pending(entries)
+        self.pending.put(item)
+        item.done.wait()
+        if item.error is not None:
+            raise RuntimeError(item.error)
+
+        findings = []
+        for filepath, results in item.results:
+            findings.extend(build_finding(res, filepath) for res in results)
+        if not unmasked:
+            for row in findings:
+                row['match'] = mask_secret(row['match'])
+        return findings
+
+    # ---- requests ----
+
+    def handle(self, request):
+        if self.token is not None and not hmac.compare_digest(str(request.get("token", "")), self.token):
+            return {"ok": False, "error": "Unauthorized"}
+        with self.lock:
+            self.requests += 1
+        op = request.get("op")
+        unmasked = request.get("unmasked") is True
+        if op == "scan":
+            entries = []
+            for path in request.get("paths", []):
+                if os.path.isdir(path):
+                    entries.extend(collect_files(path))
+                elif os.path.isfile(path):
+                    entries.append(path)
+                else:
+                    return {"ok": False, "error": f"No such file or directory: {path}"}
+            return {"ok": True, "files": len(entries), "findings": self._scan(entries, unmasked) if entries else []}
+        if op == "scan_text":
+            content = request.get("content", "").encode('utf-8', 'surrogatepass')
+            return {"ok": True, "files": 1, "findings": self._scan([(request.get("name", "<text>"), content)], unmasked)}
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "stats":
+            return {"ok": True, "stats": self.stats()}
+        if op == "shutdown":
+            # shutdown() waits for serve_forever(), which runs on another thread
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    def stats(self):
+        cache = getattr(self.detector, 'cache', None)
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "files": self.files,
+            "batches": self.batches,
+            "prediction_cache": cache.stats() if cache is not None else None
+        }
+
+    # ---- server ----
+
+    def bind(self):
+        if isinstance(self.address, tuple):
+            self.server = _TCPServer(self.address, _Handler)
+            self._write_token()
+        else:
+            if self.address == default_address():
+                private_dir()
+            self._remove_stale_socket()
+            # Only the owner may connect: the socket is created with mode 0600
+            old_umask = os.umask(0o177)
+            try:
+                self.server = _UnixServer(self.address, _Handler)
+            finally:
+                os.umask(old_umask)
+        self.server.daemon = self
+        return self
+
+    def _write_token(self):
+        path = os.path.join(private_dir(), f"daemon-{self.address[1]}.token")
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.token)
+
+    def _remove_stale_socket(self):
+        if not os.path.lexists(self.address):
+            return
+        check_owner(self.address)
+        try:
+            DaemonClient(self.address, timeout=1).ping()
+        except OSError:
+            os.unlink(self.address)
+            return
+        raise RuntimeError(f"A daemon is already listening on {self.address}")
+
+    def serve_forever(self):
+        scorer = threading.Thread(target=self._score_loop, daemon=True)
+        scorer.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.pending.put(None)
+            self.server.server_close()
+            path = token_path(self.address[1]) if isinstance(self.address, tuple) else self.address
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+
+
+class DaemonClient:
+    """
+    Blocking client for ScanDaemon; one connection, reused across requests.
+    Raises OSError when no daemon is listening (or the socket belongs to
+    another user) and RuntimeError for failed requests. Over TCP the token is
+    read from the daemon's token file unless `token` is given.
+    """
+
+    def __init__(self, address=None, timeout=30, token=None):
+        self.address = address or default_address()
+        self.timeout = timeout
+        self.token = token
+        self.sock = None
+        self.reader = None
+
+    def connect(self):
+        if isinstance(self.address, tuple):
+            if self.token is None:
+                self.token = read_token(self.address[1])
+            self.sock = socket.create_connection(self.address, timeout=self.timeout)
+        else:
+            check_owner(self.address)
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(self.timeout)
+            try:
+                self.sock.connect(self.address)
+            except OSError:
+                self.sock.close()
+                self.sock = None
+                raise
+        self.reader = self.sock.makefile('rb')
+        return self
+
+    def request(self, payload):
+        if self.sock is None:
+            self.connect()
+        if self.token is not None:
+            payload = dict(payload, token=self.token)
+        self.sock.sendall(json.dumps(payload).encode('utf-8') + b"\n")
+        line = self.reader.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("Daemon closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "Request failed"))
+        return reply
+
+    def scan(self, paths, unmasked=False):
+        """
+        Findings for files and directories (paths are resolved on the client side).
+        Matches come back masked unless `unmasked` is set.
+        """
+        return self.request({"op": "scan", "paths": [os.path.abspath(p) for p in paths],
+                             "unmasked": unmasked})["findings"]
+
+    def scan_text(self, name, content, unmasked=False):
+        return self.request({"op": "scan_text", "name": name, "content": content,
+                             "unmasked": unmasked})["findings"]
+
+    def ping(self):
+        return self.request({"op": "ping"})
+
+    def stats(self):
+        return self.request({"op": "stats"})["stats"]
+
+    def shutdown(self):
+        return self.request({"op": "shutdown"})
+
+    def close(self):
+        if self.sock is not None:
+            self.reader.close()
+            self.sock.close()
+            self.sock = None
+            self.reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_address(args):
+    if args.port:
+        return ("127.0.0.1", args.port)
+    return args.socket or default_address()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="codesentry-daemon", description="CodeSentry local scan daemon")
+    location = argparse.ArgumentParser(add_help=False)
+    where = location.add_mutually_exclusive_group()
+    where.add_argument("--socket", help="Unix socket path (default: daemon.sock in a private per-user directory)")
+    where.add_argument("--port", type=int, help="Use localhost TCP on this port instead of a Unix socket")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", parents=[location], help="Load the model and serve scan requests")
+    scan = subparsers.add_parser("scan", parents=[location, cli.output_options()],
+                                 help="Scan files or directories through a running daemon")
+    scan.add_argument("paths", nargs="+", help="Files or directories to scan")
+    subparsers.add_parser("stats", parents=[location], help="Print daemon statistics as JSON")
+    subparsers.add_parser("stop", parents=[location], help="Stop a running daemon")
+    return parser
+
+
+def serve(address):
+    if not cli.check_model():
+        return cli.EXIT_ERROR
+
+    from .detector import MLDetector
+    detector = MLDetector(verbose=True)
+    if not detector.model:
+        return cli.EXIT_ERROR
+
+    try:
+        daemon = ScanDaemon(detector, address).bind()
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return cli.EXIT_ERROR
+    print(f"System: Daemon listening on {address}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print("System: Daemon stopped")
+    return cli.EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    address = parse_address(args)
+    if args.command == "serve":
+        return serve(address)
+
+    start = time.perf_counter()
+    try:
+        with DaemonClient(address) as client:
+            if args.command == "stats":
+                print(json.dumps(client.stats(), indent=2))
+                return cli.EXIT_OK
+            if args.command == "stop":
+                client.shutdown()
+                return cli.EXIT_OK
+            findings = client.scan(args.paths)
+    except OSError as e:
+        print(f"Error: no daemon at {address} ({e}); start one with "
+              f"'python -m main_function.daemon serve'", file=sys.stderr)
+        return cli.EXIT_ERROR
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return cli.EXIT_ERROR
+
+    cli.write_report(args, findings, {})
+    return cli.finish(args, cli.count_risks(findings), f"Scanned {len(args.paths)} paths via daemon", start)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,38 @@
-import xgboost as xgb
 import numpy as np
 import os
-import re
 import sys
+import time
 
 # Ensure core.utils can be imported
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from utils import extract_features
+from utils import extract_features_batch, KNOWN_PREFIXES
+from tokenizer import extract_candidates, extract_window, extract_pem_blocks, candidate_offsets, LineIndex
+from reader import LARGE_FILE, SNIFF_BLOCK, file_size, read_file, map_file, iter_windows, release, sniff, SkipCounter
+from prediction_cache import PredictionCache, DEFAULT_CACHE_SIZE, text_key
+from tree_model import TreeEnsemble
+from prefilter import PrefilterCascade
+from instrument import Instrumentation
+
+# PEM private key blocks are structural certainties and skip the model
+PEM_PROBABILITY = 1.0
+
+# Feature order used during training (Must match training data exactly)
+FEATURE_NAMES = ['Entropy', 'Length', 'Digit Ratio', 'Upper Ratio', 'Symbol Ratio', 'Prefix Score', 'Length Score']
 
 class MLDetector:
-    def __init__(self):
-        self.string_pattern = re.compile(r'["\'](.*?)["\']')
+    def __init__(self, verbose=True, cache_size=DEFAULT_CACHE_SIZE, prefilter=True, sniff_content=True,
+                 instrument=False):
+        self.verbose = verbose
         self.model = None
+        # Stage timers and counters (see instrument.py); None keeps the hot path untouched
+        self.instrument = Instrumentation() if instrument else None
+        # Binary and minified content is skipped (and counted) before tokenizing
+        self.sniff_content = sniff_content
+        self.skipped = SkipCounter()
+        # Cheap rejection stages in front of the model; False disables them
+        self.prefilter = PrefilterCascade(KNOWN_PREFIXES) if prefilter else None
+        # Repeated candidates (fixtures, placeholders) are predicted once; 0 disables
+        self.cache = PredictionCache(cache_size) if cache_size else None
 
         # Determine current directory and model path
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -22,65 +43,320 @@ class MLDetector:
 
         if os.path.exists(model_path):
             try:
-                self.model = xgb.Booster()
-                self.model.load_model(model_path)
-                print("System: Model loaded successfully.")
+                self.model = self.load_model(model_path)
+                if self.verbose:
+                    print("System: Model loaded successfully.")
             except Exception as e:
-                print(f"Error: Failed to load model: {e}")
+                print(f"Error: Failed to load model: {e}", file=sys.stderr)
                 self.model = None
         else:
-            print(f"Error: Model file not found at {model_path}")
+            print(f"Error: Model file not found at {model_path}", file=sys.stderr)
+
+    @staticmethod
+    def load_model(model_path):
+        """
+        Loads the model into the NumPy tree evaluator (no xgboost import needed).
+        Models the evaluator cannot represent fall back to an xgboost Booster.
+        """
+        try:
+            return TreeEnsemble.load(model_path)
+        except ValueError:
+            import xgboost as xgb
+            booster = xgb.Booster()
+            booster.load_model(model_path)
+            return booster
+
+    @staticmethod
+    def classify(prob):
+        """
+        Maps a model probability to a risk level.
+        Returns None when the probability is below the noise floor.
+        """
+        # Thresholds based on empirical distribution where max scores are ~0.7
+        # Only report if probability exceeds noise floor (0.15)
+        if prob <= 0.15:
+            return None
+        if prob > 0.65:
+            return "CRITICAL" # Highest confidence (e.g., standard AWS patterns)
+        if prob > 0.45:
+            return "HIGH"     # Strong structural match
+        if prob > 0.35:
+            return "MEDIUM"   # Uncertain zone; structurally plausible but low confidence
+        return "LOW"          # (0.15-0.35) Weak signal, useful for auditing
+
+    @staticmethod
+    def extract_candidates(line_content, filename=''):
+        """Returns the candidates of a single line that fall in the 8-200 length window."""
+        return [text for _, text in extract_candidates(line_content.encode('utf-8'), filename)]
+
+    def predict(self, texts):
+        """
+        Scores a batch of candidate strings with a single model call.
+        Returns a float32 array of probabilities aligned with `texts`.
+        Cached texts, and repeats within the batch, are not scored again.
+        """
+        if self.cache is None:
+            return self.predict_uncached(texts)
+
+        keys = [text_key(text) for text in texts]
+        probs, missing = self.cache.lookup(keys)
+        if not missing:
+            return probs
+
+        # 1. One prediction per distinct key still missing
+        positions = {}
+        for i in missing:
+            positions.setdefault(keys[i], []).append(i)
+        unique = [indexes[0] for indexes in positions.values()]
+        fresh = self.predict_uncached([texts[i] for i in unique])
+
+        # 2. Fill every occurrence and remember the result
+        for prob, indexes in zip(fresh.tolist(), positions.values()):
+            probs[indexes] = prob
+        self.cache.store(list(positions), fresh)
+        return probs
+
+    def predict_uncached(self, texts):
+        instrument = self.instrument
+        if instrument: t = time.perf_counter()
+        features = extract_features_batch(texts)
+        if instrument: t = instrument.lap("features", t)
+
+        if self.prefilter is None:
+            # inplace_predict skips the DMatrix construction entirely
+            probs = self.model.inplace_predict(features)
+            scored = len(texts)
+        else:
+            # Rows failing the entropy gate are certain non-secrets (probability 0)
+            probs = np.zeros(len(texts), dtype=np.float32)
+            passed = self.prefilter.gate(features)
+            scored = int(np.count_nonzero(passed))
+            if scored:
+                probs[passed] = self.model.inplace_predict(features[passed])
+
+        if instrument:
+            instrument.lap("predict", t)
+            instrument.add("candidates_scored", scored)
+        return probs
 
     def scan_line(self, line_content, line_num):
+        return self.scan_lines([(line_num, line_content)])
 
-        potential_strings = self.string_pattern.findall(line_content)
-        results = []
+    def score(self, texts):
+        """
+        Scores candidate strings in one predict call.
+        Returns (index, prob, risk) for every candidate above the noise floor.
+        """
+        if not texts:
+            return []
 
-        for text in potential_strings:
-            # 1. Filter short strings (Too short to be a valid key)
-            if len(text) < 8 or len(text) > 200:
-                continue
-            
-            # 2. Predict only if model exists
-            if self.model:
-                try:
-                    # Extract features
-                    features = np.array([extract_features(text)])
-                    
-                    # Create XGBoost DMatrix
-                    dtest = xgb.DMatrix(features)
-                    
-                    # Manually assign feature names (Must match training data exactly)
-                    dtest.feature_names = ['Entropy', 'Length', 'Digit Ratio', 'Upper Ratio', 'Symbol Ratio', 'Prefix Score', 'Length Score']
-                    
-                    # Perform prediction
-                    prob = self.model.predict(dtest)[0]
-                    
-                    # 3. Determine Risk Level
-                    # Thresholds based on empirical distribution where max scores are ~0.7
-                    risk = None
-
-                    # Only report if probability exceeds noise floor (0.15)
-                    if prob > 0.15:
-                        if prob > 0.65:
-                            risk = "CRITICAL" # Highest confidence (e.g., standard AWS patterns)
-                        elif prob > 0.45:
-                            risk = "HIGH"     # Strong structural match
-                        elif prob > 0.35:
-                            risk = "MEDIUM"   # Uncertain zone; structurally plausible but low confidence
-                        else:
-                            risk = "LOW"      # (0.15-0.35) Weak signal, useful for auditing
-                    
-                        results.append({
-                            "line": line_num,
-                            "word": text,
-                            "score": round(prob * 100, 1),
-                            "risk": risk
-                        })
-                except Exception as e:
-                    print(f"Error during prediction: {e}")
+        # Predict only if model exists
+        if not self.model:
+            # Warning if model is not loaded
+            if self.verbose:
+                for text in texts:
+                    print(f"Warning: Potential target '{text}' found, but AI model is not loaded.")
+            return []
+
+        instrument = self.instrument
+        if instrument:
+            instrument.add("candidates_seen", len(texts))
+            t = time.perf_counter()
+        # Candidates rejected by the cascade never reach the model
+        indexes = self.prefilter.select(texts) if self.prefilter else range(len(texts))
+        if instrument: instrument.lap("prefilter", t)
+        if not indexes:
+            return []
+
+        try:
+            probs = self.predict([texts[i] for i in indexes])
+        except Exception as e:
+            print(f"Error during prediction: {e}", file=sys.stderr)
+            return []
+
+        hits = []
+        for i, prob in zip(indexes, probs.tolist()):
+            risk = self.classify(prob)
+            if risk is not None:
+                hits.append((i, prob, risk))
+        return hits
+
+    @staticmethod
+    def make_result(line_num, text, prob, risk, column=None):
+        result = {
+            "line": line_num,
+            "word": text,
+            "score": round(prob * 100, 1),
+            "risk": risk
+        }
+        if column is not None:
+            result["column"] = column
+        return result
+
+    def scan_lines(self, lines):
+        """
+        Batch version of scan_line.
+        `lines` is an iterable of (line_num, line_content) pairs, optionally with the
+        file name as a third item so the format-aware rules apply; every candidate
+        is collected first and scored in one predict call.
+        """
+        line_nums = []
+        texts = []
+        if self.instrument: t = time.perf_counter()
+        for entry in lines:
+            line_num, line_content = entry[0], entry[1]
+            filename = entry[2] if len(entry) > 2 else ''
+            for text in self.extract_candidates(line_content, filename):
+                line_nums.append(line_num)
+                texts.append(text)
+        if self.instrument: self.instrument.lap("tokenize", t)
+
+        return [self.make_result(line_nums[i], texts[i], prob, risk) for i, prob, risk in self.score(texts)]
+
+    def scan_buffer(self, buffer, filename=''):
+        """Scans a whole file buffer (bytes) with the format-aware tokenizer."""
+        return self.scan_files([(filename, buffer)])[0][1]
+
+    def scan_file(self, filepath):
+        """Scans a whole file with a single predict call."""
+        return self.scan_files([filepath])[0][1]
+
+    def scan_files(self, filepaths, should_stop=None):
+        """
+        Scans a chunk of files with a single predict call.
+        Entries are paths, or (name, bytes) pairs for content that is already in memory.
+        Large files are memory-mapped and scanned window by window instead.
+        Returns a list of (filepath, results) pairs in input order.
+        `should_stop` is polled between files; files after a stop are dropped.
+        """
+        per_file = []
+        small = []
+        owners = []
+        texts = []
+        match_nos = []
+        instrument = self.instrument
+        file_seconds = []
+        for entry in filepaths:
+            if should_stop and should_stop(): break
+            if instrument: t = start = time.perf_counter()
+            if isinstance(entry, tuple):
+                filepath, buffer = entry
             else:
-                # Warning if model is not loaded
-                print(f"Warning: Potential target '{text}' found, but AI model is not loaded.")
-        
-        return results
\ No newline at end of file
+                filepath = entry
+                if file_size(filepath) >= LARGE_FILE:
+                    per_file.append((filepath, self.scan_large_file(filepath, should_stop)))
+                    continue
+                buffer = read_file(filepath)
+            if instrument: t = instrument.lap("read", t)
+
+            results = []
+            per_file.append((filepath, results))
+            if self.skip_content(buffer, len(buffer), filepath):
+                if instrument: instrument.file_done(filepath, t - start, len(buffer))
+                continue
+
+            candidates = extract_candidates(buffer, filepath)
+            pems = extract_pem_blocks(buffer)
+            found = []
+            if pems:
+                # Candidates inside a key block are reported once, as the block
+                offsets = candidate_offsets(buffer, filepath, [n for n, _ in candidates]) if candidates else {}
+                candidates = [(n, t) for n, t in candidates if not self.inside(offsets[n], pems)]
+                found = [(offset, text, PEM_PROBABILITY, "CRITICAL") for offset, _, text in pems]
+
+            for match_no, text in candidates:
+                owners.append(len(small))
+                match_nos.append(match_no)
+                texts.append(text)
+            small.append((filepath, buffer, results, found))
+            if instrument:
+                t = instrument.lap("tokenize", t)
+                file_seconds.append(t - start)
+
+        # Score every candidate of the chunk at once, then split the hits back per file
+        hits_per_file = {}
+        for i, prob, risk in self.score(texts):
+            hits_per_file.setdefault(owners[i], []).append((i, prob, risk))
+
+        for owner, (filepath, buffer, results, found) in enumerate(small):
+            if instrument: t = time.perf_counter()
+            hits = hits_per_file.get(owner)
+            if hits:
+                # Positions are only resolved for the candidates that are reported
+                offsets = candidate_offsets(buffer, filepath, [match_nos[i] for i, _, _ in hits])
+                found.extend((offsets[match_nos[i]], texts[i], prob, risk) for i, prob, risk in hits)
+            results.extend(self.locate_results(buffer, found))
+            if instrument:
+                # A file's time excludes the chunk's shared scoring
+                instrument.file_done(filepath, file_seconds[owner] + time.perf_counter() - t, len(buffer))
+                instrument.lap("locate", t)
+                instrument.add("findings", len(results))
+        return per_file
+
+    def scan_large_file(self, filepath, should_stop=None):
+        """
+        Scans a memory-mapped file window by window (one predict call per window).
+        Memory use depends on the window size, not on the file size.
+        """
+        results = []
+        instrument = self.instrument
+        file_start = time.perf_counter()
+        size = 0
+        try:
+            with map_file(filepath) as mm:
+                size = len(mm)
+                if self.skip_content(mm, len(mm), filepath):
+                    return results
+                line_index = LineIndex(mm)
+                # End of the last match (or key block) of the previous window
+                scanned_to = 0
+                for start, limit, end in iter_windows(mm, resume=lambda: scanned_to):
+                    if should_stop and should_stop(): break
+
+                    if instrument: t = time.perf_counter()
+                    candidates, scanned_to = extract_window(mm, filepath, start, limit, end)
+                    pems = extract_pem_blocks(mm, start, limit, end)
+                    if pems:
+                        candidates = [(o, t) for o, t in candidates if not self.inside(o, pems)]
+                        scanned_to = max(scanned_to, pems[-1][1])
+                    if instrument: instrument.lap("tokenize", t)
+
+                    found = [(offset, text, PEM_PROBABILITY, "CRITICAL") for offset, _, text in pems]
+                    for i, prob, risk in self.score([t for _, t in candidates]):
+                        found.append((candidates[i][0], candidates[i][1], prob, risk))
+                    if instrument: t = time.perf_counter()
+                    results.extend(self.locate_results(mm, found, line_index))
+                    if instrument: instrument.lap("locate", t)
+
+                    # Finish line counting for this window before its pages are dropped
+                    line_index.advance(max(limit, scanned_to))
+                    release(mm, start, limit)
+        except (OSError, ValueError):
+            pass
+        finally:
+            if instrument:
+                instrument.file_done(filepath, time.perf_counter() - file_start, size)
+                instrument.add("findings", len(results))
+        return results
+
+    def skip_content(self, buffer, size, filename=''):
+        """True (and counted) when the start of `buffer` is binary or minified (code/bundle files only)."""
+        if not self.sniff_content:
+            return False
+        reason = sniff(buffer[:SNIFF_BLOCK], filename)
+        if reason:
+            self.skipped.add(reason, size)
+        return reason is not None
+
+    @staticmethod
+    def inside(offset, blocks):
+        return any(start <= offset < end for start, end, _ in blocks)
+
+    def locate_results(self, buffer, found, line_index=None):
+        """Turns (offset, text, prob, risk) tuples into results, in file order."""
+        line_index = line_index or LineIndex(buffer)
+        results = []
+        for offset, text, prob, risk in sorted(found, key=lambda f: f[0]):
+            line_num, column = line_index.locate(offset)
+            results.append(self.make_result(line_num, text, prob, risk, column))
+        return results
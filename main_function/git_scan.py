@@ -0,0 +1,253 @@
+"""
+Git-aware scanning: only lines added in a diff, or every blob in history.
+
+Modes:
+    staged   - lines added in the index (`git diff --cached`), for pre-commit hooks
+    range    - lines added by each commit in a range (`git log -p A..B`), for PR gating
+    history  - every reachable blob exactly once, deduplicated by blob SHA
+
+In the diff modes the added lines of each file are joined into one buffer and
+scanned like a file, so multi-line PEM keys are found and findings carry a
+column.
+"""
+import codecs
+import os
+import re
+import subprocess
+import tempfile
+import threading
+
+from .scanner import SCAN_EXTENSIONS, build_finding
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+# Changed files (diff modes) and blobs (history) are scored in batches of
+# this many files or bytes
+BLOB_BATCH = 256
+BLOB_BATCH_BYTES = 8 << 20
+
+# Plain, machine-readable diff output regardless of user configuration
+GIT_DIFF_FLAGS = ['-U0', '--no-color', '--no-ext-diff', '--no-textconv']
+
+
+def _git(repo, *args, **kwargs):
+    # stderr goes to a file: a pipe nobody reads blocks git once it is full
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        ['git', '-C', repo, '-c', 'core.quotePath=false'] + list(args),
+        stdout=subprocess.PIPE, stderr=errors, **kwargs
+    )
+    proc.errors = errors
+    return proc
+
+
+def _unquote_path(path):
+    # Paths with special characters are still C-quoted by git
+    if path.startswith('"') and path.endswith('"'):
+        path = codecs.escape_decode(path[1:-1].encode('utf-8'))[0].decode('utf-8', 'replace')
+    return path
+
+
+def parse_diff(stream):
+    """
+    Parses unified diff text (from `git diff` or `git log -p`) and yields
+    (commit, path, line_num, text) for every added line. `commit` is None
+    for plain diffs. Line numbers refer to the new version of the file.
+    """
+    commit = None
+    path = None
+    line_num = 0
+    old_left = new_left = 0
+
+    for raw in stream:
+        line = raw.rstrip('\n').rstrip('\r')
+
+        # Inside a hunk: the header counts tell exactly which lines belong to it
+        if old_left > 0 or new_left > 0:
+            if line.startswith('+'):
+                if path is not None:
+                    yield commit, path, line_num, line[1:]
+                line_num += 1
+                new_left -= 1
+                continue
+            if line.startswith('-'):
+                old_left -= 1
+                continue
+            if line.startswith(' '):
+                line_num += 1
+                old_left -= 1
+                new_left -= 1
+                continue
+            if line.startswith('\\'):
+                continue
+            old_left = new_left = 0
+
+        if line.startswith('commit '):
+            commit = line.split()[1]
+            path = None
+        elif line.startswith('diff --git '):
+            path = None
+        elif line.startswith('+++ '):
+            # git appends a tab after names containing spaces
+            target = _unquote_path(line[4:].rstrip('\t'))
+            path = None if target == '/dev/null' else target[2:] if target.startswith('b/') else target
+        elif line.startswith('@@'):
+            m = HUNK_HEADER.match(line)
+            if m:
+                old_left = int(m.group(1)) if m.group(1) is not None else 1
+                line_num = int(m.group(2))
+                new_left = int(m.group(3)) if m.group(3) is not None else 1
+
+
+def added_files(entries):
+    """
+    Groups parse_diff() entries into one buffer per (commit, path).
+    Yields (commit, path, buffer, line_nums): the added lines joined in order
+    (utf-8 bytes), and the new-file line number of each buffer line.
+    """
+    key = None
+    lines, line_nums = [], []
+    for commit, path, line_num, text in entries:
+        if (commit, path) != key:
+            if lines:
+                yield key[0], key[1], '\n'.join(lines).encode('utf-8'), line_nums
+            key, lines, line_nums = (commit, path), [], []
+        lines.append(text)
+        line_nums.append(line_num)
+    if lines:
+        yield key[0], key[1], '\n'.join(lines).encode('utf-8'), line_nums
+
+
+class GitScanner:
+    """Feeds git diffs or history blobs to an MLDetector and yields finding rows."""
+
+    def __init__(self, detector, repo='.'):
+        self.detector = detector
+        self.repo = os.path.abspath(repo)
+
+    # Diff modes
+
+    def scan_staged(self):
+        return self._scan_diff(['diff', '--cached'] + GIT_DIFF_FLAGS)
+
+    def scan_range(self, rev_range):
+        return self._scan_diff(['log', '-p', '--pretty=format:commit %H'] + GIT_DIFF_FLAGS + [rev_range, '--'])
+
+    def _scan_diff(self, args):
+        proc = _git(self.repo, *args, text=True, encoding='utf-8', errors='ignore')
+        added = (entry for entry in parse_diff(proc.stdout) if entry[1].lower().endswith(SCAN_EXTENSIONS))
+        completed = False
+        try:
+            yield from self._score(added_files(added))
+            completed = True
+        finally:
+            self._finish(proc, completed)
+
+    def _score(self, files):
+        batch, size = [], 0
+        for entry in files:
+            batch.append(entry)
+            size += len(entry[2])
+            if len(batch) >= BLOB_BATCH or size >= BLOB_BATCH_BYTES:
+                yield from self._score_batch(batch)
+                batch, size = [], 0
+        if batch:
+            yield from self._score_batch(batch)
+
+    def _score_batch(self, batch):
+        # One predict per batch; buffer line numbers are mapped back to the new file
+        scanned = self.detector.scan_files([(path, buffer) for _, path, buffer, _ in batch])
+        for (commit, _, _, line_nums), (path, results) in zip(batch, scanned):
+            for res in results:
+                res['line'] = line_nums[res['line'] - 1]
+                row = build_finding(res, path)
+                if commit:
+                    row['commit'] = commit
+                yield row
+
+    # Full history mode
+
+    def list_blobs(self):
+        """Returns [(blob_sha, path)] for every reachable blob with a scannable extension, once per SHA."""
+        proc = _git(self.repo, 'rev-list', '--all', '--objects', text=True, encoding='utf-8', errors='ignore')
+        candidates = {}
+        for line in proc.stdout:
+            sha, _, path = line.rstrip('\n').partition(' ')
+            # rev-list --objects already prints each object once; trees match no extension
+            if path and path.lower().endswith(SCAN_EXTENSIONS) and sha not in candidates:
+                candidates[sha] = path
+        self._finish(proc, True)
+
+        # Drop anything that is not a blob (e.g. a directory named "x.json")
+        check = _git(self.repo, 'cat-file', '--batch-check=%(objectname) %(objecttype)',
+                     stdin=subprocess.PIPE, text=True)
+        out, _ = check.communicate(''.join(sha + '\n' for sha in candidates))
+        check.errors.close()
+        blobs = []
+        for line in out.splitlines():
+            sha, _, kind = line.partition(' ')
+            if kind == 'blob':
+                blobs.append((sha, candidates[sha]))
+        return blobs
+
+    def scan_history(self):
+        blobs = self.list_blobs()
+        if not blobs:
+            return
+
+        proc = _git(self.repo, 'cat-file', '--batch', stdin=subprocess.PIPE)
+
+        # Feed object names from a thread so a full stdout pipe cannot deadlock us
+        def feed():
+            try:
+                for sha, _ in blobs:
+                    proc.stdin.write(sha.encode() + b'\n')
+                proc.stdin.close()
+            except OSError:
+                pass
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+
+        def batches():
+            batch, size = [], 0
+            for sha, path in blobs:
+                header = proc.stdout.readline().split()
+                if len(header) < 3:
+                    break
+                data = proc.stdout.read(int(header[2]))
+                proc.stdout.read(1)  # trailing newline
+                batch.append((sha, path, data))
+                size += len(data)
+                if len(batch) >= BLOB_BATCH or size >= BLOB_BATCH_BYTES:
+                    yield batch
+                    batch, size = [], 0
+            if batch:
+                yield batch
+
+        completed = False
+        try:
+            for batch in batches():
+                # Whole blobs go through the format-aware tokenizer, one predict per batch
+                scanned = self.detector.scan_files([(path, data) for _, path, data in batch])
+                for (sha, _, _), (path, results) in zip(batch, scanned):
+                    for res in results:
+                        row = build_finding(res, path)
+                        row['blob'] = sha
+                        yield row
+            completed = True
+        finally:
+            self._finish(proc, completed)
+            writer.join()
+
+    @staticmethod
+    def _finish(proc, completed):
+        """Reaps a git process; raises if it failed, kills it if the caller stopped early."""
+        if not completed:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+        with proc.errors:
+            if completed and proc.returncode != 0:
+                proc.errors.seek(0)
+                err = proc.errors.read().decode('utf-8', 'ignore')
+                raise RuntimeError(f"git failed: {err.strip()}")
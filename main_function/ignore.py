@@ -0,0 +1,97 @@
+"""
+.gitignore-style path filtering.
+
+Every directory may contain a .gitignore and a project-level
+.codesentryignore (same syntax). Rules apply to the directory they live in
+and everything below it; later rules win and `!pattern` re-includes.
+Supported: comments, blank lines, negation, trailing `/` (directories only),
+leading or inner `/` (anchored to the file's directory), `*`, `?`, `[...]`
+and `**`.
+"""
+import os
+import re
+
+IGNORE_FILES = ('.gitignore', '.codesentryignore')
+
+
+class IgnoreRule:
+    def __init__(self, pattern, base):
+        self.negate = pattern.startswith('!')
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # A slash anywhere but the end anchors the pattern to `base`
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+
+        self.base = base
+        body = translate(pattern)
+        self.regex = re.compile(body + '$' if anchored else '(?:.*/)?' + body + '$')
+
+    def matches(self, relpath, is_dir):
+        return (is_dir or not self.dir_only) and self.regex.match(relpath) is not None
+
+
+def translate(pattern):
+    """Glob pattern -> regex body; `*` and `?` never cross a `/`."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif c == '*':
+            out.append('[^/]*')
+            i += 1
+        elif c == '?':
+            out.append('[^/]')
+            i += 1
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end + 1
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return ''.join(out)
+
+
+def load_rules(directory):
+    """Rules from the ignore files of one directory (empty if there are none)."""
+    rules = []
+    for name in IGNORE_FILES:
+        try:
+            with open(os.path.join(directory, name), 'r', encoding='utf-8', errors='ignore') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            line = line.rstrip()
+            if line and not line.startswith('#'):
+                rules.append(IgnoreRule(line, directory))
+    return rules
+
+
+def is_ignored(rules, path, is_dir=False):
+    """Last matching rule wins; paths are matched relative to each rule's directory."""
+    for rule in reversed(rules):
+        # Paths come from walking below rule.base, so slicing is enough
+        relpath = path[len(rule.base):].lstrip(os.sep).replace(os.sep, '/')
+        if rule.matches(relpath, is_dir):
+            return not rule.negate
+    return False
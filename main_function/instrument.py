@@ -0,0 +1,130 @@
+"""
+Opt-in scan instrumentation: counters, per-stage wall time and the slowest files.
+
+Stages are timed with perf_counter laps, so the cost when enabled is a clock
+read per stage and nothing at all when disabled (callers check for None):
+
+    t = time.perf_counter()
+    buffer = read_file(path)
+    t = instrument.lap("read", t)
+
+Worker processes send their numbers back with every chunk (take()), and the
+parent merges them (merge()).
+"""
+import cProfile
+import heapq
+import json
+import time
+
+# Stages in pipeline order
+STAGES = ("walk", "cache", "read", "tokenize", "prefilter", "features", "predict", "locate")
+
+COUNTERS = ("files", "cache_hits", "bytes_read", "candidates_seen", "candidates_scored", "findings")
+
+# Slowest files kept for the report
+SLOWEST_FILES = 10
+
+
+class Instrumentation:
+    def __init__(self, slowest=SLOWEST_FILES):
+        self.slowest_limit = slowest
+        self.reset()
+
+    def reset(self):
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        # Min-heap of (seconds, path, bytes); the fastest entry is dropped first
+        self.slowest = []
+
+    def lap(self, stage, start):
+        """Adds the time since `start` to `stage` and returns the current clock."""
+        now = time.perf_counter()
+        self.seconds[stage] += now - start
+        return now
+
+    def add(self, counter, value=1):
+        self.counts[counter] += value
+
+    def file_done(self, path, seconds, size):
+        """
+        Records one file's own time. For batched small files this is their
+        read/tokenize/locate time; the chunk's shared scoring is not split up.
+        """
+        self.counts["files"] += 1
+        self.counts["bytes_read"] += size
+        self._rank((seconds, path, size))
+
+    def _rank(self, entry):
+        if len(self.slowest) < self.slowest_limit:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def merge(self, other):
+        """Adds a snapshot (as_dict()) or another Instrumentation."""
+        other = other.as_dict() if hasattr(other, 'as_dict') else other
+        for name, value in other["counters"].items():
+            self.counts[name] += value
+        for name, value in other["seconds"].items():
+            self.seconds[name] += value
+        for entry in other["slowest_files"]:
+            self._rank((entry["seconds"], entry["path"], entry["bytes"]))
+
+    def take(self):
+        """Snapshot and reset (used by worker processes after every chunk)."""
+        snapshot = self.as_dict()
+        self.reset()
+        return snapshot
+
+    def as_dict(self):
+        return {
+            "counters": dict(self.counts),
+            "seconds": {name: round(value, 6) for name, value in self.seconds.items()},
+            "slowest_files": [{"path": path, "seconds": round(seconds, 6), "bytes": size}
+                              for seconds, path, size in sorted(self.slowest, reverse=True)]
+        }
+
+    def summary(self):
+        """Human-readable report, one line per item."""
+        counts = self.counts
+        lines = [
+            f"Files {counts['files']} scanned, {counts['cache_hits']} from cache | read {counts['bytes_read'] / (1 << 20):.1f} MB | "
+            f"candidates {counts['candidates_seen']} seen, {counts['candidates_scored']} scored | "
+            f"findings {counts['findings']}"
+        ]
+        # Summed over threads and worker processes, so it can exceed the wall time
+        total = sum(self.seconds.values()) or 1.0
+        for stage in STAGES:
+            seconds = self.seconds[stage]
+            lines.append(f"  {stage:<10}{seconds:>9.3f} s {seconds / total:>6.1%}")
+        if self.slowest:
+            lines.append("Slowest files:")
+            for seconds, path, size in sorted(self.slowest, reverse=True):
+                lines.append(f"  {seconds * 1000:>9.1f} ms {size:>10} B  {path}")
+        return "\n".join(lines)
+
+    def export(self, path, **extra):
+        data = self.as_dict()
+        data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+
+class Profiler:
+    """
+    cProfile around a block; the output file is in pstats format
+    (python -m pstats, snakeviz, gprof2dot). Only the calling process is
+    profiled; worker processes are not.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        self.profile.dump_stats(self.path)
@@ -0,0 +1,126 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Entries kept per process (an entry costs roughly 100 bytes)
+DEFAULT_CACHE_SIZE = 65536
+
+# Slots in the table shared by scan worker processes (8 bytes each, 2 MB)
+SHARED_SLOTS = 1 << 18
+
+
+def text_key(text):
+    """64-bit key of a candidate; only this digest is kept, never the text itself."""
+    digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def create_shared_table(ctx):
+    """
+    Allocates the cross-process table and its hit/miss counters.
+    Both are passed to the workers as initializer arguments.
+    """
+    return ctx.RawArray('Q', SHARED_SLOTS), ctx.Array('Q', 2)
+
+
+class PredictionCache:
+    """
+    Bounded LRU of model probabilities keyed by text_key().
+
+    Optionally backed by a direct-mapped table in shared memory so scan
+    workers reuse each other's predictions. A shared slot packs a 32-bit tag
+    of the key with the float32 probability into one aligned 64-bit word, so
+    a slot is always read or written as a whole; a colliding key simply
+    overwrites the slot.
+    """
+
+    def __init__(self, size=DEFAULT_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.shared = None
+        self.counters = None
+
+    def attach_shared(self, table, counters=None):
+        self.shared = np.frombuffer(table, dtype=np.uint64)
+        self.counters = counters
+
+    def lookup(self, keys):
+        """
+        Returns (probs, missing): a float32 array with the cached probabilities
+        and the indexes of `keys` that still need a prediction.
+        """
+        probs = np.zeros(len(keys), dtype=np.float32)
+        missing = []
+        entries = self.entries
+        for i, key in enumerate(keys):
+            prob = entries.get(key)
+            if prob is None:
+                missing.append(i)
+            else:
+                entries.move_to_end(key)
+                probs[i] = prob
+
+        if missing and self.shared is not None:
+            missing = self._lookup_shared(keys, missing, probs)
+
+        hits = len(keys) - len(missing)
+        self.hits += hits
+        self.misses += len(missing)
+        if self.counters is not None:
+            with self.counters.get_lock():
+                self.counters[0] += hits
+                self.counters[1] += len(missing)
+        return probs, missing
+
+    def store(self, keys, probs):
+        entries = self.entries
+        for key, prob in zip(keys, probs.tolist()):
+            entries[key] = prob
+        self._evict()
+
+        if self.shared is not None:
+            keys = np.array(keys, dtype=np.uint64)
+            words = (self._tags(keys) << np.uint64(32)) | np.asarray(probs, dtype=np.float32).view(np.uint32).astype(np.uint64)
+            self.shared[keys & np.uint64(SHARED_SLOTS - 1)] = words
+
+    def _lookup_shared(self, keys, missing, probs):
+        wanted = np.array([keys[i] for i in missing], dtype=np.uint64)
+        words = self.shared[wanted & np.uint64(SHARED_SLOTS - 1)]
+        found = (words >> np.uint64(32)) == self._tags(wanted)
+        if not found.any():
+            return missing
+
+        values = (words & np.uint64(0xFFFFFFFF)).astype(np.uint32).view(np.float32)
+        still_missing = []
+        for j, i in enumerate(missing):
+            if found[j]:
+                probs[i] = values[j]
+                self.entries[keys[i]] = values[j].item()
+            else:
+                still_missing.append(i)
+        self._evict()
+        return still_missing
+
+    def _evict(self):
+        entries = self.entries
+        while len(entries) > self.size:
+            entries.popitem(last=False)
+
+    @staticmethod
+    def _tags(keys):
+        # Upper 32 bits of the key; bit 0 forced on so an empty slot (0) never matches
+        return (keys >> np.uint64(32)) | np.uint64(1)
+
+    def stats(self):
+        return cache_stats(self.hits, self.misses, len(self.entries))
+
+
+def cache_stats(hits, misses, entries=None):
+    total = hits + misses
+    stats = {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 4) if total else None}
+    if entries is not None:
+        stats["entries"] = entries
+    return stats
@@ -0,0 +1,114 @@
+import re
+
+import numpy as np
+
+# Candidates below this Shannon entropy (bits/char) never score above the noise floor
+MIN_ENTROPY = 3.0
+
+# Absolute and relative file paths: /usr/lib/x, ./a/b, ../c, ~/d, C:\e
+PATH = re.compile(r'(?:[A-Za-z]:[\\/]|\.{0,2}/|~/)[\w.\-/\\]*$')
+
+# Lower-case words joined by _ . or -: identifiers, config keys, placeholders
+WORDS = re.compile(r'[a-z]+(?:[_.\-][a-z]+)*$')
+
+# Stages in the order they run; 'entropy' needs the feature matrix and runs last
+STAGES = ("whitespace", "url", "path", "words", "entropy")
+
+# Column of the entropy / known-prefix feature in extract_features_batch
+ENTROPY_COLUMN = 0
+PREFIX_COLUMN = 5
+
+
+def has_whitespace(text):
+    return ' ' in text or '\t' in text
+
+
+def is_url(text):
+    # URLs carrying user:password@ credentials are kept
+    return '://' in text and '@' not in text
+
+
+def is_path(text):
+    return PATH.match(text) is not None
+
+
+def is_words(text):
+    return WORDS.match(text) is not None
+
+
+# Text stages: name -> predicate that is True for candidates to discard
+TEXT_STAGES = {
+    "whitespace": has_whitespace,
+    "url": is_url,
+    "path": is_path,
+    "words": is_words,
+}
+
+
+class PrefilterCascade:
+    """
+    Cheap rejection stages run before feature extraction and the model.
+
+    Candidates starting with one of `prefixes` are fast-accepted and always
+    reach the model. Every other candidate goes through the text stages (no
+    allocation beyond a substring test or an anchored regex), then the
+    entropy gate on the feature matrix. Each stage was checked against the
+    model: nothing it rejects scores above the 0.15 noise floor.
+    """
+
+    def __init__(self, prefixes, stages=STAGES, min_entropy=MIN_ENTROPY):
+        self.prefixes = tuple(prefixes)
+        self.text_stages = [(name, TEXT_STAGES[name]) for name in stages if name in TEXT_STAGES]
+        self.entropy_gate = "entropy" in stages
+        self.min_entropy = min_entropy
+        self.counts = dict.fromkeys(stage_names(stages), 0)
+        self.counters = None
+
+    def attach_shared(self, counters):
+        """Also adds every count to a shared array (one slot per key of self.counts)."""
+        self.counters = counters
+
+    def select(self, texts):
+        """Indexes of the candidates that survive the text stages."""
+        counts = self.counts
+        delta = dict.fromkeys(counts, 0)
+        delta["seen"] = len(texts)
+        kept = []
+        for i, text in enumerate(texts):
+            if text.startswith(self.prefixes):
+                delta["accepted"] += 1
+                kept.append(i)
+                continue
+            for name, reject in self.text_stages:
+                if reject(text):
+                    delta[name] += 1
+                    break
+            else:
+                kept.append(i)
+        self._add(delta)
+        return kept
+
+    def gate(self, features):
+        """Boolean mask of feature rows that pass the entropy gate."""
+        passed = (features[:, ENTROPY_COLUMN] >= self.min_entropy) | (features[:, PREFIX_COLUMN] > 0)
+        if self.entropy_gate:
+            self._add({"entropy": int(len(passed) - np.count_nonzero(passed)), "passed": int(np.count_nonzero(passed))})
+            return passed
+        self._add({"passed": len(passed)})
+        return np.ones(len(passed), dtype=bool)
+
+    def _add(self, delta):
+        for name, value in delta.items():
+            self.counts[name] += value
+        if self.counters is not None:
+            with self.counters.get_lock():
+                for slot, name in enumerate(self.counts):
+                    self.counters[slot] += delta.get(name, 0)
+
+    def stats(self):
+        return dict(self.counts)
+
+
+def stage_names(stages=STAGES):
+    """Keys of PrefilterCascade.counts, in slot order for the shared counters."""
+    return ("seen", "accepted", *stages, "passed")
@@ -0,0 +1,161 @@
+"""
+Memory-mapped, windowed reading for large files.
+
+Small files are read in one go. Larger ones are mapped and scanned in fixed
+windows that end on a line boundary whenever possible; a window's regex scan
+may run `OVERLAP` bytes past its end so candidates (and PEM blocks) that
+start inside it can complete. Pages that have been scanned are released so
+resident memory stays flat regardless of file size.
+
+sniff() looks at the first block of a file so binaries and minified bundles
+that slipped past the extension filter are skipped before tokenizing. Only
+code/bundle suffixes are checked for minification: one-line JSON credential
+files and compact configs are exactly where secrets live.
+"""
+import mmap
+import os
+from contextlib import contextmanager
+
+WINDOW_SIZE = 4 << 20
+
+# Longest candidate or PEM block that may straddle a window boundary
+OVERLAP = 64 << 10
+
+# Files at least this large are mapped instead of read
+LARGE_FILE = WINDOW_SIZE
+
+# Bytes inspected by sniff() at the start of every file
+SNIFF_BLOCK = 8 << 10
+
+# A head at least this long whose lines average more than MINIFIED_LINE bytes is minified
+MINIFIED_MIN_BYTES = 4 << 10
+MINIFIED_LINE = 500
+
+# Only these file types are ever treated as minified bundles
+MINIFIED_SUFFIXES = ('.js', '.mjs', '.cjs', '.css', '.map')
+
+# Reasons a file is not scanned, in report order
+SKIP_REASONS = ("ignored", "too_large", "generated", "binary", "minified")
+
+
+def file_size(filepath):
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+
+def read_file(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read()
+    except OSError:
+        return b''
+
+
+@contextmanager
+def map_file(filepath):
+    """Yields a read-only mmap of the file (or b'' for empty files)."""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def iter_windows(buffer, window=WINDOW_SIZE, overlap=OVERLAP, resume=None):
+    """
+    Yields (start, limit, end) for every window of the buffer.
+    Scan [start, end) and keep only matches that start before `limit`;
+    the next window starts at `limit`, or at `resume()` when the last scan
+    consumed bytes past it.
+    """
+    size = len(buffer)
+    start = 0
+    while start < size:
+        limit = min(start + window, size)
+        if limit < size:
+            # Cut after a newline so the next window starts in a clean state
+            nl = buffer.rfind(b'\n', start, limit)
+            if nl >= start:
+                limit = nl + 1
+        yield start, limit, min(limit + overlap, size)
+        # Without a newline the cut may fall inside a quoted string: resuming
+        # after the match that crosses it keeps the quotes paired
+        start = max(limit, resume()) if resume else limit
+
+
+def release(buffer, start, end):
+    """Drops the pages of [start, end) from a mapping once they have been scanned."""
+    if not isinstance(buffer, mmap.mmap) or not hasattr(buffer, 'madvise'):
+        return
+    page_start = start - start % mmap.PAGESIZE
+    page_end = end - end % mmap.PAGESIZE
+    if page_end > page_start:
+        try:
+            buffer.madvise(mmap.MADV_DONTNEED, page_start, page_end - page_start)
+        except (AttributeError, OSError, ValueError):
+            pass
+
+
+def sniff(head, filename=''):
+    """
+    Classifies the first SNIFF_BLOCK bytes of a file.
+    Returns 'binary', 'minified' or None for text worth scanning.
+    """
+    if b'\0' in head:
+        return "binary"
+    if not filename.lower().endswith(MINIFIED_SUFFIXES):
+        return None
+    if len(head) >= MINIFIED_MIN_BYTES and head.count(b'\n') * MINIFIED_LINE < len(head):
+        return "minified"
+    return None
+
+
+class SkipCounter:
+    """Files and bytes skipped per reason; optionally mirrored into a shared array."""
+
+    def __init__(self):
+        self.files = dict.fromkeys(SKIP_REASONS, 0)
+        self.bytes = dict.fromkeys(SKIP_REASONS, 0)
+        self.counters = None
+
+    def attach_shared(self, counters):
+        """`counters` holds 2 slots per reason: files, bytes."""
+        self.counters = counters
+
+    def add(self, reason, size):
+        self.files[reason] += 1
+        self.bytes[reason] += size
+        if self.counters is not None:
+            slot = 2 * SKIP_REASONS.index(reason)
+            with self.counters.get_lock():
+                self.counters[slot] += 1
+                self.counters[slot + 1] += size
+
+    def merge(self, other):
+        for reason in SKIP_REASONS:
+            self.files[reason] += other.files[reason]
+            self.bytes[reason] += other.bytes[reason]
+
+    @classmethod
+    def from_shared(cls, counters):
+        skipped = cls()
+        values = counters[:]
+        for i, reason in enumerate(SKIP_REASONS):
+            skipped.files[reason] = values[2 * i]
+            skipped.bytes[reason] = values[2 * i + 1]
+        return skipped
+
+    def total_files(self):
+        return sum(self.files.values())
+
+    def total_bytes(self):
+        return sum(self.bytes.values())
+
+    def as_dict(self):
+        return {reason: {"files": self.files[reason], "bytes": self.bytes[reason]} for reason in SKIP_REASONS}
@@ -0,0 +1,282 @@
+import bz2
+import csv
+import functools
+import gzip
+import json
+import lzma
+import os
+
+# Column layout of the CSV report (shared by the GUI export and the CLI)
+CSV_HEADERS = ["Risk", "File", "Path", "Line", "Confidence", "Time", "Match Content (Masked)"]
+
+# SARIF severity for each risk level
+SARIF_LEVELS = {"CRITICAL": "error", "HIGH": "error", "MEDIUM": "warning", "LOW": "note"}
+
+# Rows between progress callbacks / cancellation checks of export()
+PROGRESS_EVERY = 5000
+
+
+def mask_secret(text):
+    """
+    Masks sensitive parts of the string.
+    Every report format goes through this so raw secrets never reach disk.
+    """
+    if not text: return ""
+    if len(text) <= 8:
+        return text[:2] + "****"
+    return text[:4] + "********" + text[-4:]
+
+
+def format_bytes(size):
+    """Human-readable size for status messages (e.g. '3.4 MB')."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def masked_row(row):
+    masked = row.copy()
+    masked['match'] = mask_secret(row['match'])
+    return masked
+
+
+# Encoders are built once; json.dumps() would build one per row
+ROW_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=4)
+SARIF_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+LINE_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+# ---- Streaming writers ----
+# Each report is written row by row: open it, write() every finding, close().
+# Nothing but the current row is held in memory, so huge result sets can be
+# exported straight from the ResultStore or while a scan is still running.
+
+class ReportStream:
+    def __init__(self, f, owns_file=False):
+        self.f = f
+        self.owns_file = owns_file
+        self.count = 0
+
+    def write(self, row):
+        self._write(row)
+        self.count += 1
+
+    def _write(self, row):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        """Writes the closing part of the report (and closes the file if it was opened here)."""
+        self._finish()
+        if self.owns_file:
+            self.f.close()
+        else:
+            self.f.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvStream(ReportStream):
+    def __init__(self, f, **kwargs):
+        super().__init__(f, **kwargs)
+        self.writer = csv.writer(f)
+        self.writer.writerow(CSV_HEADERS)
+
+    def _write(self, row):
+        self.writer.writerow([
+            row['risk'],
+            row['file'],
+            row.get('path', ''),
+            row['line'],
+            f"{row['score']:.2f}%",
+            row['timestamp'],
+            mask_secret(row['match']) # Apply Mask
+        ])
+
+
+class JsonStream(ReportStream):
+    """A JSON array, laid out like json.dump(rows, indent=4)."""
+
+    def _write(self, row):
+        item = ROW_ENCODER.encode(masked_row(row)).replace("\n", "\n    ")
+        self.f.write(("[\n    " if not self.count else ",\n    ") + item)
+
+    def _finish(self):
+        self.f.write("\n]" if self.count else "[]")
+
+
+class JsonLinesStream(ReportStream):
+    """One JSON object per line; can be appended to and read back line by line."""
+
+    def _write(self, row):
+        self.f.write(LINE_ENCODER.encode(masked_row(row)) + "\n")
+
+
+class SarifStream(ReportStream):
+    """Writes a SARIF 2.1.0 log (understood by GitHub code scanning and most CI dashboards)."""
+
+    # Depth of a result object inside the log (runs > run > results > result)
+    RESULT_INDENT = " " * 8
+
+    def __init__(self, f, base_path=None, **kwargs):
+        super().__init__(f, **kwargs)
+        self.base_path = base_path
+        # The log is written around its results list, which is filled as rows come in
+        head, tail = json.dumps(sarif_log([]), ensure_ascii=False, indent=2).split('"results": []')
+        self.tail = tail
+        f.write(head + '"results": [')
+
+    def _write(self, row):
+        item = SARIF_ENCODER.encode(sarif_result(row, self.base_path))
+        item = item.replace("\n", "\n" + self.RESULT_INDENT)
+        self.f.write(("\n" if not self.count else ",\n") + self.RESULT_INDENT + item)
+
+    def _finish(self):
+        if self.count:
+            self.f.write("\n" + self.RESULT_INDENT[:-2])
+        self.f.write("]" + self.tail)
+
+
+def sarif_result(row, base_path=None):
+    path = row.get('path') or row['file']
+    if base_path:
+        path = os.path.relpath(path, base_path)
+    return {
+        "ruleId": "potential-secret",
+        "level": SARIF_LEVELS.get(row['risk'], "warning"),
+        "message": {
+            "text": f"{row['risk']} potential secret ({row['score']:.2f}%): {mask_secret(row['match'])}"
+        },
+        "locations": [{
+            "physicalLocation": {
+                "artifactLocation": {"uri": path.replace(os.sep, "/")},
+                "region": _sarif_region(row)
+            }
+        }],
+        "properties": {"risk": row['risk'], "score": row['score']}
+    }
+
+
+def sarif_log(results):
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [{
+            "tool": {
+                "driver": {
+                    "name": "CodeSentry",
+                    "rules": [{
+                        "id": "potential-secret",
+                        "shortDescription": {"text": "Potential hard-coded secret detected by the ML model"}
+                    }]
+                }
+            },
+            "results": results
+        }]
+    }
+
+
+def _sarif_region(row):
+    region = {"startLine": row['line']}
+    if row.get('column'):
+        region["startColumn"] = row['column']
+    return region
+
+
+def _writer(stream_class):
+    """Whole-report writer function (rows, f, **kwargs) on top of a stream class."""
+    def write(rows, f, **kwargs):
+        with stream_class(f, **kwargs) as stream:
+            for row in rows:
+                stream.write(row)
+    return write
+
+
+write_csv = _writer(CsvStream)
+write_json = _writer(JsonStream)
+write_jsonl = _writer(JsonLinesStream)
+write_sarif = _writer(SarifStream)
+
+
+# Streams keyed by format name; CSV uses utf-8-sig so Excel opens it correctly
+STREAMS = {
+    "csv": (CsvStream, {"newline": "", "encoding": "utf-8-sig"}),
+    "json": (JsonStream, {"encoding": "utf-8"}),
+    "jsonl": (JsonLinesStream, {"encoding": "utf-8"}),
+    "sarif": (SarifStream, {"encoding": "utf-8"}),
+}
+
+# Whole-report writer functions, same keys
+WRITERS = {
+    "csv": (write_csv, STREAMS["csv"][1]),
+    "json": (write_json, STREAMS["json"][1]),
+    "jsonl": (write_jsonl, STREAMS["jsonl"][1]),
+    "sarif": (write_sarif, STREAMS["sarif"][1]),
+}
+
+# A report path ending in one of these is written compressed (e.g. report.sarif.gz)
+COMPRESSORS = {
+    # gzip defaults to level 9, which is several times slower than 6 for a few percent
+    ".gz": functools.partial(gzip.open, compresslevel=6),
+    ".bz2": bz2.open,
+    ".xz": lzma.open
+}
+
+
+def format_for_path(file_path, default="csv"):
+    """Report format from the file name, ignoring a compression suffix."""
+    base, ext = os.path.splitext(file_path.lower())
+    if ext in COMPRESSORS:
+        ext = os.path.splitext(base)[1]
+    return ext[1:] if ext[1:] in STREAMS else default
+
+
+def open_report(file_path, fmt, **kwargs):
+    """Opens `file_path` (compressed if its name ends in .gz / .bz2 / .xz) as a report stream."""
+    stream_class, open_kwargs = STREAMS[fmt]
+    opener = COMPRESSORS.get(os.path.splitext(file_path)[1].lower())
+    if opener:
+        f = opener(file_path, 'wt', **open_kwargs)
+    else:
+        f = open(file_path, 'w', **open_kwargs)
+    try:
+        return stream_class(f, owns_file=True, **kwargs)
+    except BaseException:
+        f.close()
+        raise
+
+
+def export(rows, file_path, fmt, progress=None, should_stop=None, **kwargs):
+    """
+    Streams `rows` to `file_path` in the given format ('csv', 'json', 'jsonl' or 'sarif').
+    progress(count) is called every PROGRESS_EVERY rows. When should_stop()
+    turns True the partial file is deleted and False is returned.
+    """
+    completed = False
+    stream = open_report(file_path, fmt, **kwargs)
+    try:
+        for row in rows:
+            if stream.count % PROGRESS_EVERY == 0 and stream.count:
+                if should_stop and should_stop():
+                    return False
+                if progress:
+                    progress(stream.count)
+            stream.write(row)
+        completed = True
+    finally:
+        stream.close()
+        if not completed:
+            # Cancelled or failed: don't leave a truncated report behind
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+    if progress:
+        progress(stream.count)
+    return True
@@ -0,0 +1,370 @@
+import os
+import sys
+from array import array
+from bisect import bisect_right
+
+from .scanner import RISK_LEVELS
+from .report import mask_secret
+
+# Columns every finding has; anything else (git 'commit'/'blob') is kept sparsely
+CORE_KEYS = ('risk', 'file', 'path', 'line', 'match', 'score', 'timestamp', 'column')
+
+# Risk name <-> small int code (0 = CRITICAL ... 3 = LOW)
+RISK_CODES = {risk: code for code, risk in enumerate(RISK_LEVELS)}
+
+
+class InternTable:
+    """Stores each distinct string once and hands out int ids for it."""
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def add(self, value):
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __len__(self):
+        return len(self.values)
+
+    def nbytes(self):
+        return sys.getsizeof(self.ids) + sys.getsizeof(self.values) + sum(sys.getsizeof(v) for v in self.values)
+
+
+class ResultStore:
+    """
+    Column-oriented store for scan findings.
+    Rows go in and come out as the usual finding dicts, but are kept as
+    interned string ids and typed arrays so a million findings stay small.
+    Matches are stored raw, once, and masked only when displayed or exported.
+    """
+    def __init__(self, rows=None):
+        self.clear()
+        if rows:
+            self.extend(rows)
+
+    def clear(self):
+        # 1. String tables (each distinct value stored once)
+        self.files = InternTable()
+        self.paths = InternTable()
+        self.matches = InternTable()
+        self.timestamps = InternTable()
+
+        # 2. Per-row columns
+        self.risk_col = array('B')
+        self.file_col = array('I')
+        self.path_col = array('I')
+        self.match_col = array('I')
+        self.time_col = array('I')
+        self.line_col = array('I')
+        self.column_col = array('I')   # 0 = no column reported
+        self.score_col = array('f')
+
+        # 3. Rare extra keys, by row index
+        self.extras = {}
+
+    def __len__(self):
+        return len(self.risk_col)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def append(self, row):
+        self.risk_col.append(RISK_CODES[row['risk']])
+        self.file_col.append(self.files.add(row['file']))
+        self.path_col.append(self.paths.add(row.get('path', row['file'])))
+        self.match_col.append(self.matches.add(row['match']))
+        self.time_col.append(self.timestamps.add(row['timestamp']))
+        self.line_col.append(row['line'])
+        self.column_col.append(row.get('column') or 0)
+        self.score_col.append(row['score'])
+
+        extra = {key: value for key, value in row.items() if key not in CORE_KEYS}
+        if extra:
+            self.extras[len(self.risk_col) - 1] = extra
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def _columns(self):
+        return (self.risk_col, self.file_col, self.path_col, self.match_col,
+                self.time_col, self.line_col, self.column_col, self.score_col)
+
+    # --- In-place edits (watch mode); strings of replaced rows stay interned ---
+
+    def indexes_of(self, path):
+        """Row indexes of the findings in `path`, or anywhere below it if it is a directory."""
+        prefix = path.rstrip(os.sep) + os.sep
+        ids = {pid for pid, value in enumerate(self.paths.values) if value == path or value.startswith(prefix)}
+        if not ids:
+            return []
+        return [index for index, pid in enumerate(self.path_col) if pid in ids]
+
+    def replace(self, index, row):
+        """Overwrites row `index` with a finding dict."""
+        self.risk_col[index] = RISK_CODES[row['risk']]
+        self.file_col[index] = self.files.add(row['file'])
+        self.path_col[index] = self.paths.add(row.get('path', row['file']))
+        self.match_col[index] = self.matches.add(row['match'])
+        self.time_col[index] = self.timestamps.add(row['timestamp'])
+        self.line_col[index] = row['line']
+        self.column_col[index] = row.get('column') or 0
+        self.score_col[index] = row['score']
+
+        extra = {key: value for key, value in row.items() if key not in CORE_KEYS}
+        if extra:
+            self.extras[index] = extra
+        else:
+            self.extras.pop(index, None)
+
+    def remove_range(self, start, stop):
+        """Deletes rows start..stop-1; later rows move up."""
+        for col in self._columns():
+            del col[start:stop]
+        if self.extras:
+            shift = stop - start
+            self.extras = {(index - shift if index >= stop else index): extra
+                           for index, extra in self.extras.items() if not start <= index < stop}
+
+    # --- Column accessors (used by the table model without building dicts) ---
+
+    def risk(self, index):
+        return RISK_LEVELS[self.risk_col[index]]
+
+    def file(self, index):
+        return self.files[self.file_col[index]]
+
+    def path(self, index):
+        return self.paths[self.path_col[index]]
+
+    def match(self, index):
+        return self.matches[self.match_col[index]]
+
+    def timestamp(self, index):
+        return self.timestamps[self.time_col[index]]
+
+    def line(self, index):
+        return self.line_col[index]
+
+    def score(self, index):
+        # float32 column; round back to the 2 decimals findings are created with
+        return round(self.score_col[index], 2)
+
+    def row(self, index):
+        """Rebuilds the finding dict for one row (for exports and the CLI)."""
+        row = {
+            'risk': self.risk(index),
+            'file': self.file(index),
+            'path': self.path(index),
+            'line': self.line_col[index],
+            'match': self.match(index),
+            'score': self.score(index),
+            'timestamp': self.timestamp(index)
+        }
+        if self.column_col[index]:
+            row['column'] = self.column_col[index]
+        if index in self.extras:
+            row.update(self.extras[index])
+        return row
+
+    def nbytes(self):
+        """Approximate memory held by the store, in bytes."""
+        total = sum(col.buffer_info()[1] * col.itemsize for col in self._columns())
+        total += sum(table.nbytes() for table in (self.files, self.paths, self.matches, self.timestamps))
+        return total + sys.getsizeof(self.extras)
+
+
+class ResultView:
+    """
+    Row order of the result table over a ResultStore: every finding sorted by
+    one column, plus the same order split per risk level, so showing a risk
+    tab is a list lookup rather than a filter pass.
+
+    Full sorts use integer keys (string columns are ranked once, not compared
+    row by row); rows added later are placed by binary search.
+    """
+    SORT_COLUMNS = ('risk', 'file', 'line', 'match', 'score', 'timestamp')
+
+    def __init__(self, store):
+        self.store = store
+        self.sort_column = None  # None = insertion order
+        self.descending = False
+        self.risk = None         # None = every risk level
+        self.rank_cache = {}
+        self.rebuild()
+
+    def rebuild(self):
+        """Recomputes the order of every row (after a sort or a store rewrite)."""
+        order = self._sorted_rows()
+        self.all_rows = array('I', order)
+        self.risk_rows = [array('I') for _ in RISK_LEVELS]
+        risk_col = self.store.risk_col
+        for index in order:
+            self.risk_rows[risk_col[index]].append(index)
+
+    @property
+    def rows(self):
+        """Store indexes of the visible rows, in display order."""
+        return self.all_rows if self.risk is None else self.risk_rows[RISK_CODES[self.risk]]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def count(self, risk=None):
+        return len(self.all_rows) if risk is None else len(self.risk_rows[RISK_CODES[risk]])
+
+    def sort(self, column, descending=False):
+        self.sort_column = column
+        self.descending = descending
+        self.rebuild()
+
+    # --- Sort keys ---
+
+    def _sorted_rows(self):
+        rows = range(len(self.store))
+        if self.sort_column is None:
+            return rows
+        keys = self.sort_keys(self.sort_column)
+        # sorted() is stable in both directions: equal keys keep insertion order
+        return sorted(rows, key=keys.__getitem__, reverse=self.descending)
+
+    def sort_keys(self, column):
+        """One integer or float key per row."""
+        store = self.store
+        if column == 'risk':
+            return store.risk_col
+        if column == 'line':
+            return store.line_col
+        if column == 'score':
+            return store.score_col
+        table, ids = self._string_column(column)
+        ranks = self._ranks(column, table)
+        return [ranks[string_id] for string_id in ids]
+
+    def _ranks(self, column, table):
+        """
+        Rank of every distinct string of a column. Interned strings never
+        change, so the ranks are reused until new strings arrive.
+        """
+        cached = self.rank_cache.get(column)
+        if cached and cached[0] is table and cached[1] == len(table):
+            return cached[2]
+        values = [self._display(column, value) for value in table.values]
+        ranks = [0] * len(values)
+        rank, previous = -1, None
+        for string_id in sorted(range(len(values)), key=values.__getitem__):
+            # Equal display values (two matches with the same mask) share a rank
+            if rank < 0 or values[string_id] != previous:
+                rank, previous = rank + 1, values[string_id]
+            ranks[string_id] = rank
+        self.rank_cache[column] = (table, len(table), ranks)
+        return ranks
+
+    def _string_column(self, column):
+        store = self.store
+        if column == 'file':
+            return store.files, store.file_col
+        if column == 'match':
+            return store.matches, store.match_col
+        if column == 'timestamp':
+            return store.timestamps, store.time_col
+        raise ValueError(f"Unknown sort column: {column}")
+
+    @staticmethod
+    def _display(column, value):
+        # Matches are shown (and therefore sorted) masked
+        return mask_secret(value) if column == 'match' else value
+
+    def sort_value(self, index):
+        """Sort value of one row, comparable with the ranked keys' order."""
+        column = self.sort_column
+        if column in ('risk', 'line', 'score'):
+            return self.sort_keys(column)[index]
+        table, ids = self._string_column(column)
+        return self._display(column, table[ids[index]])
+
+    # --- Incremental updates ---
+
+    def _position(self, rows, index):
+        """Where row `index` goes in `rows`: after every row that sorts before it or equal."""
+        if self.sort_column is None:
+            # Insertion order is store order
+            lo, hi = 0, len(rows)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if rows[mid] < index: lo = mid + 1
+                else: hi = mid
+            return lo
+        value = self.sort_value(index)
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = self.sort_value(rows[mid])
+            before = other >= value if self.descending else other <= value
+            if before and (other != value or rows[mid] < index):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def position(self, index):
+        """Display position row `index` would take, or None if the risk filter hides it."""
+        if self.risk is not None and self.store.risk_col[index] != RISK_CODES[self.risk]:
+            return None
+        return self._position(self.rows, index)
+
+    def find(self, index):
+        """Display position of row `index`, or None if it is not visible."""
+        if self.risk is not None and self.store.risk_col[index] != RISK_CODES[self.risk]:
+            return None
+        return self.rows.index(index)
+
+    def add(self, index):
+        """Places store row `index` in the order (it must be in the store already)."""
+        risk_rows = self.risk_rows[self.store.risk_col[index]]
+        if self.sort_column is None and (not self.all_rows or self.all_rows[-1] < index):
+            # Appends arrive in store order: no search needed
+            self.all_rows.append(index)
+            risk_rows.append(index)
+            return
+        self.all_rows.insert(self._position(self.all_rows, index), index)
+        risk_rows.insert(self._position(risk_rows, index), index)
+
+    def discard(self, index):
+        """Takes store row `index` out of the order (before its risk or sort value changes)."""
+        self.all_rows.remove(index)
+        self.risk_rows[self.store.risk_col[index]].remove(index)
+
+    def remove(self, runs):
+        """
+        Drops the rows of the (start, stop) runs the store deleted and
+        renumbers the rest, in one pass over each order.
+        """
+        starts, stops, removed = [], [], [0]
+        for start, stop in sorted(runs):
+            starts.append(start)
+            stops.append(stop)
+            removed.append(removed[-1] + stop - start)
+
+        def renumber(rows):
+            kept = array('I')
+            for index in rows:
+                run = bisect_right(stops, index)
+                if run == len(starts) or index < starts[run]:
+                    kept.append(index - removed[run])
+            return kept
+
+        self.all_rows = renumber(self.all_rows)
+        self.risk_rows = [renumber(rows) for rows in self.risk_rows]
+
+    def clear(self):
+        self.rank_cache.clear()
+        self.all_rows = array('I')
+        self.risk_rows = [array('I') for _ in RISK_LEVELS]
@@ -0,0 +1,495 @@
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+from .ignore import load_rules, is_ignored
+from .reader import SkipCounter
+from .instrument import Instrumentation
+
+# File selection shared by every scan front-end (GUI, workers)
+SCAN_EXTENSIONS = ('.py', '.js', '.json', '.txt', '.md', '.env', '.yml', '.xml', '.html', '.properties')
+EXCLUDED_DIRS = ['.git', 'venv', '__pycache__', 'node_modules', '.idea', '.vscode']
+
+# Generated files full of hashes and bundled code rather than hand-written secrets
+GENERATED_NAMES = {'package-lock.json', 'npm-shrinkwrap.json'}
+GENERATED_SUFFIXES = ('.min.js', '.bundle.js', '.chunk.js')
+
+# Larger files are skipped (0 = no limit)
+DEFAULT_MAX_FILE_SIZE = 50 << 20
+
+# Risk levels from most to least severe
+RISK_LEVELS = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+# Leave one core for the UI thread by default
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+
+def iter_files(target_path, is_running=lambda: True, max_size=DEFAULT_MAX_FILE_SIZE,
+               use_ignore_files=True, skipped=None):
+    """
+    Generator yielding (filepath, stat_result) for every file with a scannable
+    extension, depth-first with os.scandir. The stat result comes from the
+    DirEntry, so it is reused for the size check, progress and the scan cache.
+    Files matched by .gitignore / .codesentryignore, generated files and files
+    over `max_size` are left out and counted in `skipped` (a SkipCounter).
+    Ignored directories are pruned without being walked, so they add no bytes.
+    """
+    if skipped is None:
+        skipped = SkipCounter()
+    # (directory, ignore rules inherited from its parents)
+    stack = [(target_path, [])]
+    while stack:
+        if not is_running(): return
+        directory, rules = stack.pop()
+        if use_ignore_files:
+            rules = rules + load_rules(directory)
+
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            try:
+                if entry.is_dir():
+                    # Like os.walk: symlinked directories are listed but not followed
+                    if name not in EXCLUDED_DIRS and not entry.is_symlink():
+                        if not (rules and is_ignored(rules, entry.path, is_dir=True)):
+                            subdirs.append(entry.path)
+                    continue
+                lower = name.lower()
+                if not lower.endswith(SCAN_EXTENSIONS) or not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+
+            reason = None
+            if rules and is_ignored(rules, entry.path):
+                reason = "ignored"
+            elif lower in GENERATED_NAMES or lower.endswith(GENERATED_SUFFIXES):
+                reason = "generated"
+            elif max_size and st.st_size > max_size:
+                reason = "too_large"
+
+            if reason:
+                skipped.add(reason, st.st_size)
+            else:
+                yield entry.path, st
+
+        # Reversed so directories are visited in scandir order
+        stack.extend((path, rules) for path in reversed(subdirs))
+
+
+def collect_files(target_path, is_running=lambda: True, max_size=DEFAULT_MAX_FILE_SIZE,
+                  use_ignore_files=True, skipped=None):
+    """Returns every file iter_files() would yield, as a list of paths."""
+    return [path for path, _ in iter_files(target_path, is_running, max_size, use_ignore_files, skipped)]
+
+
+class FileStream:
+    """
+    Enumerates files on a background thread while they are being scanned.
+    Paths go through a bounded queue, so a huge tree never sits in memory;
+    `bytes_found` / `files_found` grow as the walk proceeds and `stats` maps
+    each queued path to its stat result until the consumer pops it.
+    """
+
+    QUEUE_SIZE = 4096
+    _DONE = None
+
+    def __init__(self, target_path, is_running=lambda: True, **filters):
+        self.target_path = target_path
+        self.is_running = is_running
+        self.filters = filters
+        self.skipped = filters.setdefault('skipped', SkipCounter())
+        self.stats = {}
+        self.files_found = 0
+        self.bytes_found = 0
+        # Time spent inside the directory walk itself (not waiting on the queue)
+        self.walk_seconds = 0.0
+        self.done = False
+        self._queue = queue.Queue(self.QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._walk, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _walk(self):
+        try:
+            t = time.perf_counter()
+            for path, st in iter_files(self.target_path, self.is_running, **self.filters):
+                self.walk_seconds += time.perf_counter() - t
+                self.stats[path] = st
+                self.files_found += 1
+                self.bytes_found += st.st_size
+                if not self._put(path):
+                    return
+                t = time.perf_counter()
+        finally:
+            self.done = True
+            self._put(self._DONE)
+
+    def _put(self, item):
+        # Time out now and then so a cancelled scan does not leave the walker blocked
+        while True:
+            try:
+                self._queue.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                if not self.is_running():
+                    return False
+
+    def __iter__(self):
+        while True:
+            try:
+                path = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                if not self.is_running():
+                    return
+                continue
+            if path is self._DONE:
+                return
+            yield path
+
+def build_finding(res, filepath):
+    """Converts a detector result into the row format used by the UI and reports."""
+    row = {
+        'risk': res['risk'].upper(),
+        'file': os.path.basename(filepath),
+        'path': filepath,
+        'line': res['line'],
+        'match': res['word'],
+        'score': round(res['score'], 2),
+        'timestamp': datetime.now().strftime('%H:%M:%S')
+    }
+    if 'column' in res:
+        row['column'] = res['column']
+    return row
+
+
+class ModelLoadError(RuntimeError):
+    """Raised by a scan whose detector has no model; it would otherwise report every file as clean."""
+
+
+class SequentialScanner:
+    """In-process engine: every chunk is scanned right away by one MLDetector."""
+
+    def __init__(self, detector, is_running=lambda: True):
+        self.detector = detector
+        self.is_running = is_running
+
+    def feed(self, chunk):
+        """Scans a chunk; yields (filepath, results) for each of its files, in order."""
+        if not self.is_running():
+            return
+        try:
+            scanned = self.detector.scan_files(chunk, should_stop=lambda: not self.is_running())
+        except Exception:
+            scanned = [(p, []) for p in chunk]
+        yield from scanned
+
+    def drain(self):
+        return iter(())
+
+    def close(self):
+        pass
+
+
+# Worker process state
+
+_worker_detector = None
+_worker_stop = None
+
+def _init_worker(stop_event, detector_options, shared):
+    """
+    Runs once per worker process: loads the booster a single time.
+    `shared` holds the cross-process arrays the detector's counters add into.
+    """
+    global _worker_detector, _worker_stop
+    from .detector import MLDetector
+    _worker_detector = MLDetector(verbose=False, **detector_options)
+    _worker_stop = stop_event
+    if _worker_detector.cache is not None:
+        _worker_detector.cache.attach_shared(*shared['cache'])
+    if _worker_detector.prefilter is not None:
+        _worker_detector.prefilter.attach_shared(shared['prefilter'])
+    _worker_detector.skipped.attach_shared(shared['skipped'])
+
+def _scan_chunk(chunk):
+    """Scanned files of a chunk; with instrumentation, also the chunk's stage numbers."""
+    if _worker_stop.is_set():
+        return [], None
+    if _worker_detector.model is None:
+        raise ModelLoadError("Scan worker could not load the model")
+    scanned = _worker_detector.scan_files(chunk, should_stop=_worker_stop.is_set)
+    instrument = _worker_detector.instrument
+    return scanned, instrument.take() if instrument else None
+
+
+class ParallelScanner:
+    """
+    Process-pool scanning engine.
+    Files are sharded into small chunks and handed to worker processes that
+    each keep their own MLDetector; per-chunk results stream back as they finish.
+    The workers share one prediction cache table in shared memory.
+    """
+
+    # Chunks queued per worker before feed() waits for results
+    MAX_IN_FLIGHT = 2
+
+    def __init__(self, workers=DEFAULT_WORKERS, chunk_size=16, prefilter=True, sniff_content=True, instrument=None):
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.prefilter = prefilter
+        # Workers' stage numbers are merged into `instrument` as chunks come back
+        self.instrument = instrument
+        self.detector_options = {'prefilter': prefilter, 'sniff_content': sniff_content,
+                                 'instrument': instrument is not None}
+        # Imported here so CLI start-up does not pay for multiprocessing
+        import multiprocessing
+        # spawn keeps workers independent of the Qt threads in the parent
+        self._ctx = multiprocessing.get_context('spawn')
+        self._stop_event = self._ctx.Event()
+        from .prediction_cache import create_shared_table
+        from .prefilter import stage_names
+        from .reader import SKIP_REASONS
+        self._shared = {
+            'cache': create_shared_table(self._ctx),
+            'prefilter': self._ctx.Array('Q', len(stage_names())),
+            'skipped': self._ctx.Array('Q', 2 * len(SKIP_REASONS))
+        }
+        self._executor = None
+        self._pending = {}
+
+    def feed(self, files):
+        """
+        Queues `files` for the workers and yields (filepath, results) for
+        whatever has finished meanwhile, in completion order. Blocks while
+        MAX_IN_FLIGHT chunks per worker are outstanding, which is what keeps
+        a streaming producer from running far ahead of the scan.
+        """
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._ctx,
+                initializer=_init_worker,
+                initargs=(self._stop_event, self.detector_options, self._shared)
+            )
+
+        for i in range(0, len(files), self.chunk_size):
+            if self._stop_event.is_set(): return
+            chunk = files[i:i + self.chunk_size]
+            self._pending[self._executor.submit(_scan_chunk, chunk)] = chunk
+            yield from self._collect(block=len(self._pending) >= self.workers * self.MAX_IN_FLIGHT)
+
+    def drain(self):
+        """Yields the results of every chunk still outstanding."""
+        while self._pending and not self._stop_event.is_set():
+            yield from self._collect(block=True)
+
+    def _collect(self, block):
+        from concurrent.futures import wait, FIRST_COMPLETED
+        if not self._pending:
+            return
+        # Short timeout so a cancel request is noticed promptly
+        done, _ = wait(self._pending, timeout=0.2 if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk = self._pending.pop(future)
+            try:
+                scanned, snapshot = future.result()
+            except ModelLoadError:
+                raise
+            except Exception:
+                scanned, snapshot = [(p, []) for p in chunk], None
+            if snapshot and self.instrument is not None:
+                self.instrument.merge(snapshot)
+            yield from scanned
+
+    def close(self):
+        self._stop_event.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def cancel(self):
+        """Stops all workers after the file they are currently reading."""
+        self._stop_event.set()
+
+    def cache_stats(self):
+        """Prediction cache hits/misses summed over all workers."""
+        from .prediction_cache import cache_stats
+        hits, misses = self._shared['cache'][1][:]
+        return cache_stats(hits, misses)
+
+    def prefilter_stats(self):
+        """Pre-filter stage counts summed over all workers, or None when disabled."""
+        from .prefilter import stage_names
+        return dict(zip(stage_names(), self._shared['prefilter'][:])) if self.prefilter else None
+
+    def skip_stats(self):
+        """Content skips (binary/minified) summed over all workers."""
+        return SkipCounter.from_shared(self._shared['skipped'])
+
+
+class ScanJob:
+    """
+    One scan over a file list, shared by the GUI thread and the CLI.
+    Picks the sequential or process-pool engine, replays cached findings for
+    unchanged files and records fresh results in the cache.
+    Pass `skipped` to collect_files() so its skips are reported with the scan's.
+    With instrument=True, stage timers and counters are collected in self.instrument.
+    """
+
+    def __init__(self, detector=None, workers=1, chunk_size=64, use_cache=True, cache_path=None,
+                 prefilter=True, sniff_content=True, instrument=False):
+        self.detector = detector
+        self.instrument = Instrumentation() if instrument else None
+        self.prefilter = prefilter
+        self.sniff_content = sniff_content
+        if hasattr(detector, 'sniff_content'):
+            # A given detector's options win, so both engines and the cache agree with it
+            self.prefilter = detector.prefilter is not None
+            self.sniff_content = detector.sniff_content
+        self.skipped = SkipCounter()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.use_cache = use_cache
+        self.cache_path = cache_path
+        self.cache_hits = 0
+        self.engine = None
+        self.parallel = None
+        # The detector's own instrumentation, put back when the scan ends
+        self.detector_instrument = None
+        self.is_running = True
+
+    def run(self, files, stats=None):
+        """
+        Generator yielding (filepath, results) for every file in `files`.
+        `files` may be any iterable (e.g. a FileStream); it is consumed lazily,
+        so scanning starts with the first file. `stats` optionally maps paths
+        to stat results already taken during enumeration.
+        """
+        # The SQLite connection must live in the thread that iterates
+        cache = None
+        if self.use_cache:
+            from .cache import ScanCache
+            try:
+                cache = ScanCache(self.cache_path, options=self.cache_options())
+            except Exception as e:
+                print(f"Warning: Scan cache disabled: {e}", file=sys.stderr)
+
+        stats = stats if stats is not None else {}
+        file_stats = {}
+        batch = []
+        instrument = self.instrument
+        try:
+            for filepath in files:
+                if not self.is_running: return
+                if cache:
+                    if instrument: t = time.perf_counter()
+                    results, st = cache.lookup(filepath, stats.get(filepath))
+                    if instrument: instrument.lap("cache", t)
+                    if results is not None:
+                        if instrument:
+                            instrument.add("cache_hits")
+                            instrument.add("findings", len(results))
+                        yield filepath, results
+                        continue
+                    file_stats[filepath] = st
+
+                batch.append(filepath)
+                if len(batch) >= self.chunk_size:
+                    yield from self._store(cache, file_stats, self._feed(batch))
+                    batch = []
+
+            if batch:
+                yield from self._store(cache, file_stats, self._feed(batch))
+            if self.engine:
+                yield from self._store(cache, file_stats, self.engine.drain())
+        finally:
+            if self.engine:
+                self.engine.close()
+                if not self.parallel:
+                    # The detector outlives the job (watch mode, next scan); stop recording into our numbers
+                    self.detector.instrument = self.detector_instrument
+            if cache:
+                self.cache_hits = cache.hits
+                cache.close()
+            if instrument:
+                # A FileStream times its own walk on the enumeration thread
+                instrument.seconds["walk"] += getattr(files, 'walk_seconds', 0.0)
+
+    def _store(self, cache, file_stats, scanned):
+        for filepath, results in scanned:
+            # Files cut short by a stop request must not be cached as complete
+            if cache and self.is_running:
+                cache.store(filepath, results, file_stats.pop(filepath, None))
+            yield filepath, results
+
+    def cache_options(self):
+        """Detector options that change which findings a file gets."""
+        return {'prefilter': bool(self.prefilter), 'sniff_content': self.sniff_content}
+
+    def _feed(self, batch):
+        if self.engine is None:
+            self.engine = self._start_engine(len(batch))
+        return self.engine.feed(batch)
+
+    def _start_engine(self, first_batch):
+        # Small trees (a first batch that is not even full) are not worth the worker start-up cost
+        if self.workers > 1 and first_batch >= self.chunk_size:
+            self.parallel = ParallelScanner(workers=self.workers, prefilter=self.prefilter,
+                                            sniff_content=self.sniff_content, instrument=self.instrument)
+            return self.parallel
+
+        if self.detector is None:
+            from .detector import MLDetector
+            self.detector = MLDetector(verbose=False, prefilter=self.prefilter, sniff_content=self.sniff_content)
+        elif hasattr(self.detector, 'skipped'):
+            # A detector reused across scans counts this scan's skips only
+            self.detector.skipped = SkipCounter()
+        if not self.detector.model:
+            raise ModelLoadError("The model could not be loaded")
+        # The detector records straight into this job's numbers until run() ends
+        self.detector_instrument = getattr(self.detector, 'instrument', None)
+        self.detector.instrument = self.instrument
+        return SequentialScanner(self.detector, lambda: self.is_running)
+
+    def cancel(self):
+        self.is_running = False
+        if self.parallel:
+            self.parallel.cancel()
+
+    def prediction_stats(self):
+        """Prediction cache statistics of the engine that ran, or None."""
+        if self.parallel:
+            return self.parallel.cache_stats()
+        if self.detector is not None and getattr(self.detector, 'cache', None) is not None:
+            return self.detector.cache.stats()
+        return None
+
+    def skip_stats(self):
+        """Files and bytes skipped by collect_files() and by content sniffing."""
+        skipped = SkipCounter()
+        skipped.merge(self.skipped)
+        if self.parallel:
+            skipped.merge(self.parallel.skip_stats())
+        elif getattr(self.detector, 'skipped', None) is not None:
+            skipped.merge(self.detector.skipped)
+        return skipped
+
+    def prefilter_stats(self):
+        """Candidates eliminated by each pre-filter stage, or None."""
+        if self.parallel:
+            return self.parallel.prefilter_stats()
+        if self.detector is not None and getattr(self.detector, 'prefilter', None) is not None:
+            return self.detector.prefilter.stats()
+        return None
@@ -0,0 +1,206 @@
+"""
+Single-pass candidate extraction over whole file buffers.
+
+Works on raw bytes: one compiled regex per file format is run over the entire
+buffer, the 8-200 length window is checked on match offsets before anything
+is sliced or decoded, and positions are only turned into line/column numbers
+for the candidates that are actually reported.
+"""
+import os
+import re
+
+MIN_LENGTH = 8
+MAX_LENGTH = 200
+
+# UTF-8 needs at most 4 bytes per character
+MAX_BYTES = MAX_LENGTH * 4
+
+# Quotes must pair up: "it's" is one candidate, not "it'
+QUOTED = rb'"(?P<dq>[^"\n]*)"|\'(?P<sq>[^\'\n]*)\''
+
+# KEY=value / key: value / export KEY=value with an unquoted value (.env, .properties)
+KEY_VALUE = rb'^[ \t]*(?:export[ \t]+)?[\w.\-]+[ \t]*[=:][ \t]*(?P<kv>[^\s"\'#!][^\n]*)'
+
+# key: value with an unquoted YAML scalar (anchors, tags, blocks and flow collections excluded)
+YAML_VALUE = rb'^[ \t]*(?:-[ \t]+)?[\w.\-]+:[ \t]+(?P<kv>[^\s"\'#&*!|>{\[%@`][^\n]*)'
+
+# Element text: <password>value</password>
+XML_TEXT = rb'>(?P<kv>[^<>\s][^<>\n]*)<'
+
+PATTERNS = {
+    '.env': re.compile(KEY_VALUE + rb'|' + QUOTED, re.MULTILINE),
+    '.properties': re.compile(KEY_VALUE + rb'|' + QUOTED, re.MULTILINE),
+    '.yml': re.compile(YAML_VALUE + rb'|' + QUOTED, re.MULTILINE),
+    '.yaml': re.compile(YAML_VALUE + rb'|' + QUOTED, re.MULTILINE),
+    '.xml': re.compile(XML_TEXT + rb'|' + QUOTED, re.MULTILINE),
+}
+# .json, source code and everything else: quoted strings only
+DEFAULT_PATTERN = re.compile(QUOTED)
+
+# Unquoted values end at an inline comment
+INLINE_COMMENT = re.compile(rb'[ \t]+#')
+
+# Multi-line PEM private keys; the body may also use literal "\n" escapes (JSON, .env)
+PEM_MARKER = b'PRIVATE KEY-----'
+PEM_BLOCK = re.compile(
+    rb'-----BEGIN (?P<label>[A-Z0-9 ]*PRIVATE KEY)-----'
+    rb'(?P<body>(?:[A-Za-z0-9+/=\s]|\\[nr]){32,16384})'
+)
+PEM_FILLER = re.compile(rb'\s|\\[nr]')
+PEM_MIN_BODY = 32
+
+
+# Tuple index of the unquoted-value group in findall() results (-1: none)
+KV_GROUP = {pattern: pattern.groupindex.get('kv', 0) - 1 for pattern in list(PATTERNS.values()) + [DEFAULT_PATTERN]}
+
+
+def pattern_for(filename):
+    # Called once per file, so keep it to a few string operations
+    dot = filename.rfind('.')
+    if dot < 0 or filename.rfind(os.sep) > dot:
+        return DEFAULT_PATTERN
+    pattern = PATTERNS.get(filename[dot:].lower())
+    if pattern is None:
+        # ".env.local" style names are dotenv files too
+        name = os.path.basename(filename).lower()
+        pattern = PATTERNS['.env'] if name.startswith('.env') else DEFAULT_PATTERN
+    return pattern
+
+
+def extract_candidates(buffer, filename=''):
+    """
+    Returns [(match_no, text)] for every candidate in `buffer` (bytes or mmap).
+    `match_no` identifies the regex match; candidate_offset() turns it into a
+    byte position, which is only needed for candidates that become findings.
+    """
+    pattern = pattern_for(filename)
+    kv_group = KV_GROUP[pattern]
+    candidates = []
+    # findall keeps the per-match work in C; offsets are recovered lazily
+    for match_no, groups in enumerate(pattern.findall(buffer)):
+        if kv_group >= 0:
+            raw = groups[kv_group]
+            is_kv = bool(raw)
+            if not is_kv:
+                raw = groups[1] or groups[2]
+        else:
+            raw = groups[0] or groups[1]
+            is_kv = False
+
+        text = _candidate_text(raw, is_kv)
+        if text is not None:
+            candidates.append((match_no, text))
+    return candidates
+
+
+def extract_window(buffer, filename, start, limit, end):
+    """
+    Windowed variant for mapped files: returns ([(offset, text)], consumed)
+    for the matches in [start, end) that start before `limit`. `consumed` is
+    where the last of those matches ends (at least `start`); the next window
+    must not start inside it.
+    """
+    candidates = []
+    consumed = start
+    for m in pattern_for(filename).finditer(buffer, start, end):
+        if m.start() >= limit:
+            break
+        consumed = m.end()
+        group = m.lastgroup
+        offset = m.start(group)
+        # Length window on raw offsets, before slicing
+        if m.end(group) - offset < MIN_LENGTH or m.end(group) - offset > MAX_BYTES:
+            continue
+        text = _candidate_text(buffer[offset:m.end(group)], group == 'kv')
+        if text is not None:
+            candidates.append((offset, text))
+    return candidates, consumed
+
+
+def _candidate_text(raw, is_kv):
+    # Length window on the raw bytes, before decoding
+    if len(raw) < MIN_LENGTH or len(raw) > MAX_BYTES:
+        return None
+
+    if is_kv:
+        cut = INLINE_COMMENT.search(raw)
+        if cut:
+            raw = raw[:cut.start()]
+        raw = raw.rstrip()
+
+    text = raw.decode('utf-8', errors='ignore')
+    if MIN_LENGTH <= len(text) <= MAX_LENGTH:
+        return text
+    return None
+
+
+def extract_pem_blocks(buffer, start=0, limit=None, end=None):
+    """
+    Returns [(offset, end_offset, text)] for PEM private key blocks starting in
+    [start, limit). `text` is "<LABEL>:<base64 body>" with line breaks removed.
+    """
+    limit = len(buffer) if limit is None else limit
+    end = len(buffer) if end is None else end
+    # Cheap substring test first; almost no file contains a key
+    if buffer.find(PEM_MARKER, start, end) < 0:
+        return []
+
+    blocks = []
+    for m in PEM_BLOCK.finditer(buffer, start, end):
+        if m.start() >= limit:
+            break
+        body = PEM_FILLER.sub(b'', m.group('body'))
+        if len(body) >= PEM_MIN_BODY:
+            text = m.group('label').decode('ascii') + ':' + body.decode('ascii')
+            blocks.append((m.start(), m.end(), text))
+    return blocks
+
+
+def candidate_offsets(buffer, filename, match_nos):
+    """Returns {match_no: byte offset} for the requested candidates in one pass."""
+    wanted = set(match_nos)
+    last = max(wanted)
+    offsets = {}
+    for i, m in enumerate(pattern_for(filename).finditer(buffer)):
+        if i in wanted:
+            offsets[i] = m.start(m.lastgroup)
+        if i >= last:
+            break
+    return offsets
+
+
+# Newlines are counted in slices of this size so mapped files are never copied whole
+COUNT_STEP = 1 << 20
+
+
+class LineIndex:
+    """
+    Maps byte offsets to (line, column) for bytes or mmap buffers.
+    Newlines are only counted up to the offsets that are asked for, so
+    locating hits in increasing order costs a single pass over the buffer.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self._offset = 0
+        self._line = 1
+
+    def advance(self, offset):
+        """Counts newlines up to `offset` (call before releasing a scanned window)."""
+        if offset < self._offset:
+            self._offset, self._line = 0, 1
+
+        pos = self._offset
+        while pos < offset:
+            step = min(offset, pos + COUNT_STEP)
+            self._line += self.buffer[pos:step].count(b'\n')
+            pos = step
+        self._offset = offset
+
+    def locate(self, offset):
+        """Returns the 1-based (line, column) of a byte offset."""
+        self.advance(offset)
+
+        line_start = self.buffer.rfind(b'\n', 0, offset) + 1
+        column = len(self.buffer[line_start:offset].decode('utf-8', errors='ignore')) + 1
+        return self._line, column
@@ -0,0 +1,225 @@
+"""
+Pure-NumPy evaluator for the XGBoost model trained in ML/model.py.
+
+The booster JSON is flattened into node arrays (feature, threshold, children,
+default direction, leaf value) that a vectorized evaluator walks for blocks
+of rows at a time, so scanning does not need the xgboost runtime.
+
+Export the arrays next to the model (the detector prefers them when present):
+
+    python -m main_function.tree_model ML/xgb_model.json -o ML/xgb_model.npz
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+# Trees up to this depth are evaluated in the padded (perfect binary tree) layout
+MAX_DENSE_DEPTH = 10
+
+# Rows evaluated together; the (rows, trees) index matrices of a block stay
+# cache-sized instead of growing with the whole batch
+PREDICT_BLOCK = 1024
+
+# Array names stored in the .npz export
+ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'default_left', 'value', 'roots', 'base_margin', 'depth')
+
+
+def compile_model(json_path):
+    """
+    Flattens a binary:logistic gbtree JSON model into node arrays.
+    Raises ValueError for models the evaluator does not support.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        learner = json.load(f)['learner']
+
+    # 1. Only the shape ML/model.py trains is supported
+    objective = learner['objective']['name']
+    booster = learner['gradient_booster']
+    if objective != 'binary:logistic' or booster['name'] != 'gbtree':
+        raise ValueError(f"Unsupported model: {booster['name']} / {objective}")
+
+    # base_score is saved as a probability; predictions start from its logit
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+    base_margin = np.log(base_score / (1 - base_score))
+
+    # 2. Concatenate every tree, re-basing child indices on the global arrays
+    feature, threshold, left, right, default_left, value, roots, depths = [], [], [], [], [], [], [], []
+    for tree in booster['model']['trees']:
+        if any(tree['split_type']) or tree['categories']:
+            raise ValueError("Categorical splits are not supported")
+
+        offset = len(feature)
+        roots.append(offset)
+        for node, (lc, rc) in enumerate(zip(tree['left_children'], tree['right_children'])):
+            leaf = lc == -1
+            feature.append(-1 if leaf else tree['split_indices'][node])
+            # Leaves keep their output in split_conditions
+            threshold.append(0.0 if leaf else tree['split_conditions'][node])
+            value.append(tree['split_conditions'][node] if leaf else 0.0)
+            # A leaf points at itself so extra walking steps are no-ops
+            left.append(offset + node if leaf else offset + lc)
+            right.append(offset + node if leaf else offset + rc)
+            default_left.append(bool(tree['default_left'][node]))
+        depths.append(_tree_depth(tree['left_children'], tree['right_children']))
+
+    return {
+        'feature': np.array(feature, dtype=np.int32),
+        'threshold': np.array(threshold, dtype=np.float32),
+        'left': np.array(left, dtype=np.int32),
+        'right': np.array(right, dtype=np.int32),
+        'default_left': np.array(default_left, dtype=bool),
+        'value': np.array(value, dtype=np.float32),
+        'roots': np.array(roots, dtype=np.int32),
+        'base_margin': np.array(base_margin, dtype=np.float64),
+        'depth': np.array(max(depths, default=0), dtype=np.int32)
+    }
+
+
+def _tree_depth(left_children, right_children):
+    depth, level = 0, [0]
+    while True:
+        level = [child for node in level for child in (left_children[node], right_children[node]) if child != -1]
+        if not level:
+            return depth
+        depth += 1
+
+
+def save_compiled(arrays, npz_path):
+    np.savez(npz_path, **arrays)
+
+
+def load_compiled(npz_path):
+    with np.load(npz_path) as data:
+        return {name: data[name] for name in ARRAY_NAMES}
+
+
+class TreeEnsemble:
+    """
+    Vectorized evaluator over the flattened node arrays.
+    Exposes inplace_predict() so it can stand in for xgb.Booster.
+
+    Shallow ensembles are re-laid out as perfect binary trees: a leaf above the
+    last level is copied into every leaf below it, so node i always has its
+    children at 2i+1 / 2i+2 and a batch walks all trees with three gathers
+    per level.
+    """
+
+    def __init__(self, arrays):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.default_left = arrays['default_left']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.base_margin = float(arrays['base_margin'])
+        self.depth = int(arrays['depth'])
+        # Leaves read feature 0; their children point back at themselves anyway
+        self.gather_feature = np.maximum(self.feature, 0)
+        self.dense = self.depth <= MAX_DENSE_DEPTH
+        if self.dense:
+            self._build_dense()
+
+    def _build_dense(self):
+        internal = (1 << self.depth) - 1
+        trees = len(self.roots)
+        self.dense_feature = np.zeros((trees, internal), dtype=np.int32)
+        self.dense_threshold = np.zeros((trees, internal), dtype=np.float32)
+        self.dense_default_left = np.zeros((trees, internal), dtype=bool)
+        self.dense_value = np.zeros((trees, internal + 1), dtype=np.float32)
+
+        for t, root in enumerate(self.roots.tolist()):
+            stack = [(root, 0)]
+            while stack:
+                node, pos = stack.pop()
+                if pos >= internal:
+                    self.dense_value[t, pos - internal] = self.value[node]
+                    continue
+                if self.feature[node] >= 0:
+                    self.dense_feature[t, pos] = self.feature[node]
+                    self.dense_threshold[t, pos] = self.threshold[node]
+                    self.dense_default_left[t, pos] = self.default_left[node]
+                # Padding nodes (leaf above the last level) send both ways to the same leaf
+                stack.append((self.left[node], 2 * pos + 1))
+                stack.append((self.right[node], 2 * pos + 2))
+
+        self.dense_feature = self.dense_feature.ravel()
+        self.dense_threshold = self.dense_threshold.ravel()
+        self.dense_default_left = self.dense_default_left.ravel()
+        self.dense_value = self.dense_value.ravel()
+        self.tree_offsets = np.arange(trees, dtype=np.int32) * internal
+        self.leaf_offsets = np.arange(trees, dtype=np.int32) * (internal + 1) - internal
+
+    @classmethod
+    def load(cls, model_path):
+        """
+        Loads `model_path` (the booster JSON). A sibling .npz export is used
+        instead when it is at least as new as the JSON.
+        """
+        npz_path = os.path.splitext(model_path)[0] + '.npz'
+        if os.path.exists(npz_path) and os.path.getmtime(npz_path) >= os.path.getmtime(model_path):
+            return cls(load_compiled(npz_path))
+        return cls(compile_model(model_path))
+
+    def predict_margin(self, features):
+        features = np.asarray(features, dtype=np.float32)
+        predict_block = self._predict_dense if self.dense else self._predict_walk
+        if len(features) <= PREDICT_BLOCK:
+            return predict_block(features)
+        margin = np.empty(len(features), dtype=np.float64)
+        for start in range(0, len(features), PREDICT_BLOCK):
+            margin[start:start + PREDICT_BLOCK] = predict_block(features[start:start + PREDICT_BLOCK])
+        return margin
+
+    def _predict_walk(self, features):
+        rows = np.arange(len(features))[:, None]
+
+        # Walk every (row, tree) pair one level per step; leaves stay put
+        nodes = np.broadcast_to(self.roots, (len(features), len(self.roots)))
+        for _ in range(self.depth):
+            x = features[rows, self.gather_feature[nodes]]
+            go_left = (x < self.threshold[nodes]) | (np.isnan(x) & self.default_left[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.base_margin + self.value[nodes].sum(axis=1, dtype=np.float64)
+
+    def _predict_dense(self, features):
+        n, num_features = features.shape
+        flat = np.ascontiguousarray(features).ravel()
+        row_base = np.arange(n, dtype=np.int32)[:, None] * num_features
+        has_nan = np.isnan(flat).any()
+
+        pos = np.zeros((n, len(self.roots)), dtype=np.int32)
+        for _ in range(self.depth):
+            node = pos + self.tree_offsets
+            x = flat.take(row_base + self.dense_feature.take(node))
+            # NaN compares False, so it goes right unless the split defaults left
+            go_right = ~(x < self.dense_threshold.take(node))
+            if has_nan:
+                go_right &= ~(np.isnan(x) & self.dense_default_left.take(node))
+            pos = 2 * pos + 1 + go_right
+
+        return self.base_margin + self.dense_value.take(pos + self.leaf_offsets).sum(axis=1, dtype=np.float64)
+
+    def inplace_predict(self, features):
+        """Probabilities (float32) for a (n, num_features) matrix."""
+        margin = self.predict_margin(features)
+        return (1.0 / (1.0 + np.exp(-margin))).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an XGBoost JSON model to flattened NumPy arrays")
+    parser.add_argument("model", help="Path to xgb_model.json")
+    parser.add_argument("-o", "--out", help="Output .npz (default: next to the model)")
+    args = parser.parse_args()
+
+    out = args.out or os.path.splitext(args.model)[0] + '.npz'
+    arrays = compile_model(args.model)
+    save_compiled(arrays, out)
+    print(f"Exported {len(arrays['roots'])} trees ({len(arrays['feature'])} nodes) to {out}")
+
+
+if __name__ == "__main__":
+    main()
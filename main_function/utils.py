@@ -1,6 +1,10 @@
 import math
 import re
 
+import numpy as np
+
+KNOWN_PREFIXES = ("sk-", "ghp_", "AKIA", "xoxb-", "AIza")
+
 def shannon_entropy(data):
     if not data:
         return 0
@@ -25,7 +29,7 @@ def extract_features(text: str):
 
     # 3. Prefix Check (Logic Update)
     # We remove the * 0.3 multiplier to let the model learn the weight
-    has_known_prefix = 1.0 if text.startswith(("sk-", "ghp_", "AKIA", "xoxb-", "AIza")) else 0.0
+    has_known_prefix = 1.0 if text.startswith(KNOWN_PREFIXES) else 0.0
 
     # 4. Length Ratio (Normalized)
     # Focus on standard key lengths (20-80 chars)
@@ -40,4 +44,93 @@ def extract_features(text: str):
         symbol_ratio,
         has_known_prefix, # Prefix Score
         len_score         # Length Score (Replaced Prefix Len Ratio)
-    ]
\ No newline at end of file
+    ]
+
+# Batch (NumPy) feature extraction
+
+# Rows are processed in blocks so the (rows x 128) histogram stays small
+BATCH_BLOCK_ROWS = 4096
+
+def _ascii_class_tables():
+    digit = np.zeros(128, dtype=np.int64)
+    upper = np.zeros(128, dtype=np.int64)
+    symbol = np.zeros(128, dtype=np.int64)
+    for code in range(128):
+        c = chr(code)
+        digit[code] = c.isdigit()
+        upper[code] = c.isupper()
+        symbol[code] = not c.isalnum()
+    return digit, upper, symbol
+
+def _entropy_terms(counts, lengths):
+    """
+    Computes -p * log2(p) for every (count, length) pair.
+    Each distinct pair is evaluated once with math.log2, exactly like
+    shannon_entropy does, so every term is bit-identical to the scalar path.
+    """
+    # count <= length, so 32 bits each keep every pair distinct
+    keys = lengths.astype(np.int64) << 32 | counts.astype(np.int64)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    values = np.empty(len(unique_keys), dtype=np.float64)
+    for i, key in enumerate(unique_keys.tolist()):
+        n, c = key >> 32, key & 0xFFFFFFFF
+        p_x = c / n
+        values[i] = - p_x * math.log2(p_x)
+    return values[inverse]
+
+def _ascii_block_features(texts, out):
+    digit_tab, upper_tab, symbol_tab = _ascii_class_tables()
+
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode("ascii"), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(texts)), lengths)
+
+    # Per-row byte histogram in a single bincount
+    hist = np.bincount(rows * 128 + codes, minlength=len(texts) * 128).reshape(len(texts), 128)
+
+    # 1. Entropy (summed from the non-zero histogram cells of each row)
+    row_idx, char_idx = np.nonzero(hist)
+    terms = _entropy_terms(hist[row_idx, char_idx], lengths[row_idx])
+    entropy = np.bincount(row_idx, weights=terms, minlength=len(texts))
+
+    # 2. Character Ratios via lookup tables
+    safe_len = np.maximum(lengths, 1)
+    digit_ratio = (hist @ digit_tab) / safe_len
+    upper_ratio = (hist @ upper_tab) / safe_len
+    symbol_ratio = (hist @ symbol_tab) / safe_len
+
+    # 3. Prefix Check
+    has_known_prefix = np.fromiter((t.startswith(KNOWN_PREFIXES) for t in texts), dtype=np.float64, count=len(texts))
+
+    # 4. Length Ratio (Normalized)
+    len_score = np.where((lengths >= 20) & (lengths <= 80), 1.0, np.where(lengths > 80, 0.5, 0.2))
+
+    block = np.column_stack([entropy, lengths, digit_ratio, upper_ratio, symbol_ratio, has_known_prefix, len_score])
+    block[lengths == 0] = 0
+    out[:] = block
+
+def extract_features_batch(texts):
+    """
+    Vectorized extract_features for a list of strings.
+    Returns an (n, 7) float32 matrix whose rows equal
+    np.float32(extract_features(text)) for every text.
+    Non-ASCII strings fall back to the scalar function so Unicode
+    character classes behave exactly like str.isdigit/isupper/isalnum.
+    """
+    texts = list(texts)
+    features = np.zeros((len(texts), 7), dtype=np.float64)
+
+    ascii_rows = []
+    for i, text in enumerate(texts):
+        if text.isascii():
+            ascii_rows.append(i)
+        else:
+            features[i] = extract_features(text)
+
+    for start in range(0, len(ascii_rows), BATCH_BLOCK_ROWS):
+        rows = ascii_rows[start:start + BATCH_BLOCK_ROWS]
+        block = np.empty((len(rows), 7), dtype=np.float64)
+        _ascii_block_features([texts[i] for i in rows], block)
+        features[rows] = block
+
+    return features.astype(np.float32)
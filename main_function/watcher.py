@@ -0,0 +1,291 @@
+"""
+Filesystem watching for continuous, incremental scans.
+
+create_watcher() returns an inotify watcher on Linux and a polling watcher
+elsewhere (or when inotify is unavailable / out of watches). Both expose
+wait(), which blocks until a burst of changes has settled and returns the
+files to rescan and the paths (files or whole directories) that are gone:
+
+    watcher = create_watcher(root)
+    while True:
+        changes = watcher.wait(is_running)
+        if changes is None: break
+        changed, removed = changes
+
+Only files a full scan would pick up are reported (same extensions,
+excluded directories, ignore files, generated-file and size filters).
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from .ignore import IGNORE_FILES, load_rules, is_ignored
+from .scanner import iter_files, SCAN_EXTENSIONS, EXCLUDED_DIRS, GENERATED_NAMES, GENERATED_SUFFIXES, DEFAULT_MAX_FILE_SIZE
+
+# A batch is handed out once no event arrived for DEBOUNCE seconds,
+# or MAX_DELAY seconds after its first event while saves keep coming
+DEBOUNCE = 0.5
+MAX_DELAY = 5.0
+
+# Seconds between snapshots of the polling watcher
+POLL_INTERVAL = 2.0
+
+# How long one wait step blocks before checking is_running again
+WAIT_STEP = 0.2
+
+# inotify event bits (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class PathFilter:
+    """
+    Decides whether a single path would be part of a full scan of `root`.
+    Ignore rules are loaded per directory and cached until an ignore file changes.
+    """
+
+    def __init__(self, root, max_size=DEFAULT_MAX_FILE_SIZE, use_ignore_files=True):
+        self.root = os.path.abspath(root)
+        self.max_size = max_size
+        self.use_ignore_files = use_ignore_files
+        self.rules = {}
+
+    def _rules(self, directory):
+        if directory not in self.rules:
+            self.rules[directory] = load_rules(directory) if self.use_ignore_files else []
+        return self.rules[directory]
+
+    def forget_rules(self):
+        self.rules.clear()
+
+    def wants_dir(self, path):
+        return self._check(path, is_dir=True)
+
+    def wants_file(self, path):
+        name = os.path.basename(path).lower()
+        if not name.endswith(SCAN_EXTENSIONS) or name in GENERATED_NAMES or name.endswith(GENERATED_SUFFIXES):
+            return False
+        try:
+            if self.max_size and os.path.getsize(path) > self.max_size:
+                return False
+        except OSError:
+            return False
+        return self._check(path, is_dir=False)
+
+    def _check(self, path, is_dir):
+        relative = os.path.relpath(path, self.root)
+        if relative.startswith(os.pardir):
+            return False
+        parts = [] if relative == os.curdir else relative.split(os.sep)
+
+        # Same pruning as iter_files: every parent directory must be walkable
+        directory, rules = self.root, list(self._rules(self.root))
+        for depth, name in enumerate(parts):
+            path_here = os.path.join(directory, name)
+            last = depth == len(parts) - 1
+            if not last or is_dir:
+                if name in EXCLUDED_DIRS or (rules and is_ignored(rules, path_here, is_dir=True)):
+                    return False
+            elif rules and is_ignored(rules, path_here):
+                return False
+            if not last:
+                directory = path_here
+                rules = rules + self._rules(directory)
+        return True
+
+
+class _Watcher:
+    """Debouncing shared by both watchers; subclasses implement poll()."""
+
+    def __init__(self, root, debounce=DEBOUNCE, max_delay=MAX_DELAY, **filters):
+        self.root = os.path.abspath(root)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.filters = filters
+        self.path_filter = PathFilter(self.root, **filters)
+
+    def poll(self, timeout):
+        """Paths touched since the last call (waits up to `timeout` seconds)."""
+        raise NotImplementedError
+
+    def wait(self, is_running=lambda: True):
+        """
+        Blocks until changes have settled; returns (changed, removed) sets,
+        or None once is_running() turns False.
+        """
+        touched = set()
+        first = last = None
+        while is_running():
+            events = self.poll(WAIT_STEP)
+            now = time.monotonic()
+            if events:
+                touched |= events
+                last = now
+                first = first or now
+            if touched and (now - last >= self.debounce or now - first >= self.max_delay):
+                changes = self.classify(touched)
+                if changes[0] or changes[1]:
+                    return changes
+                touched, first, last = set(), None, None
+        return None
+
+    def classify(self, touched):
+        """Splits touched paths by what is on disk now (a save may delete and recreate a file)."""
+        if any(os.path.basename(path) in IGNORE_FILES for path in touched):
+            self.path_filter.forget_rules()
+
+        changed, removed = set(), set()
+        for path in touched:
+            if os.path.isdir(path):
+                if self.path_filter.wants_dir(path):
+                    # iter_files only knows the rules below `path`; the filter adds the parents'
+                    changed.update(p for p, _ in iter_files(path, **self.filters) if self.path_filter.wants_file(p))
+            elif os.path.isfile(path):
+                if self.path_filter.wants_file(path):
+                    changed.add(path)
+                else:
+                    # e.g. the file is now ignored or too large
+                    removed.add(path)
+            else:
+                removed.add(path)
+        return changed, removed
+
+    def close(self):
+        pass
+
+
+class PollingWatcher(_Watcher):
+    """Compares (size, mtime) snapshots of the tree every `interval` seconds."""
+
+    def __init__(self, root, interval=POLL_INTERVAL, **options):
+        super().__init__(root, **options)
+        self.interval = interval
+        self.snapshot = self._snapshot()
+        self.next_poll = time.monotonic() + interval
+
+    def _snapshot(self):
+        return {path: (st.st_size, st.st_mtime_ns) for path, st in iter_files(self.root, **self.filters)}
+
+    def poll(self, timeout):
+        delay = self.next_poll - time.monotonic()
+        if delay > 0:
+            time.sleep(min(timeout, delay))
+            if delay > timeout:
+                return set()
+
+        current = self._snapshot()
+        self.next_poll = time.monotonic() + self.interval
+        touched = {path for path, sig in current.items() if self.snapshot.get(path) != sig}
+        touched.update(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return touched
+
+
+class InotifyWatcher(_Watcher):
+    """
+    inotify (Linux) through ctypes: one watch per directory, added as
+    directories appear. Raises OSError when inotify cannot be used.
+    """
+
+    def __init__(self, root, **options):
+        super().__init__(root, **options)
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        try:
+            self._watch_tree(self.root)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, top):
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                # Out of watches: let the caller fall back to polling
+                if errno == 28:
+                    raise OSError(errno, "inotify watch limit reached")
+                continue
+            self.dirs[wd] = directory
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and self.path_filter.wants_dir(entry.path):
+                            stack.append(entry.path)
+            except OSError:
+                pass
+
+    def poll(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+
+        touched = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: rescan everything
+                touched.add(self.root)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.dirs[wd]
+                continue
+            if mask & IN_DELETE_SELF:
+                touched.add(directory)
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and self.path_filter.wants_dir(path):
+                self._watch_tree(path)
+            touched.add(path)
+        return touched
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(root, use_inotify=True, interval=POLL_INTERVAL, **options):
+    """InotifyWatcher where available, PollingWatcher otherwise."""
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root, **options)
+        except (OSError, AttributeError):
+            # No inotify in this libc, or the watch limit is too low for the tree
+            pass
+    return PollingWatcher(root, interval, **options)
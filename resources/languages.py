@@ -20,11 +20,19 @@ class LanguageManager:
             "ready": "準備就緒",
             "scan_complete": "掃描完成",
             "scan_stopped": "掃描已取消",
+            "skipped_summary": "（略過 {0} 個檔案，{1}）",
+            "watch_changes": "監看變更",
+            "watching": "監看變更中...",
+            "watch_updated": "已重新掃描 {0} 個變更的檔案",
             "no_folder": "尚未選擇資料夾",
             "no_data": "沒有可匯出的資料",
             "export_success": "匯出成功",
             "export_success_msg": "報告已儲存至：\n{}",
             "export_error": "匯出失敗",
+            "exporting": "匯出報告中...",
+            "export_cancelled": "已取消匯出",
+            "cancel": "取消",
+            "model_loading": "模型載入中...",
             "model_loaded": "模型已載入",
             "model_failed": "模型載入失敗",
             "tab_all": "全部紀錄",
@@ -40,7 +48,8 @@ class LanguageManager:
             "col_time": "時間",
             "stat_label": "此類別共有 {} 筆發現",
             "lang_en": "English",
-            "lang_zh": "繁體中文"
+            "lang_zh": "繁體中文",
+            "workers": "平行工作程序數"
         },
         "en_US": {
             "app_title": "CodeSentry - Sensitive Data Scanner",
@@ -52,11 +61,19 @@ class LanguageManager:
             "ready": "Ready",
             "scan_complete": "Scan Complete",
             "scan_stopped": "Scan Canceled",
+            "skipped_summary": "(skipped {0} files, {1})",
+            "watch_changes": "Watch for Changes",
+            "watching": "Watching for changes...",
+            "watch_updated": "Rescanned {0} changed files",
             "no_folder": "No folder selected",
             "no_data": "No data to export",
             "export_success": "Export Successful",
             "export_success_msg": "Report saved to:\n{}",
             "export_error": "Export Failed",
+            "exporting": "Exporting report...",
+            "export_cancelled": "Export cancelled",
+            "cancel": "Cancel",
+            "model_loading": "Loading Model...",
             "model_loaded": "Model Loaded",
             "model_failed": "Model Failed",
             "tab_all": "All Logs",
@@ -72,7 +89,8 @@ class LanguageManager:
             "col_time": "Time",
             "stat_label": "Found {} items in this category",
             "lang_en": "English",
-            "lang_zh": "Traditional Chinese"
+            "lang_zh": "Traditional Chinese",
+            "workers": "Worker Processes"
         }
     }
 